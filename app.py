@@ -1,17 +1,32 @@
 # ==================================================
 # HOUSE CHORES API (JSON + XML + CRUD + SEARCH)
-# Flask + MySQL + JWT + Session
+# Flask + MySQL/SQLite + JWT + Session
 # ==================================================
 
-from flask import Flask, request, jsonify, render_template_string, session
+from flask import Flask, request, jsonify, render_template_string, session, has_request_context, g, send_from_directory
 from flask_bcrypt import Bcrypt
 from functools import wraps
 import datetime
 import jwt
-import MySQLdb
-import MySQLdb.cursors
 import xml.etree.ElementTree as ET
 import os
+import tempfile
+import uuid
+from write_behind import CompletionBuffer
+from db_router import ReplicaRouter, parse_replicas
+from storage import create_backend
+from auto_assign import plan_assignments, load_planning_data, insert_plan
+from response_cache import ResponseCache
+from query_batch import run_concurrently, run_sequentially
+from archive import (ARCHIVE_TABLE_SQL, archive_completed, assignments_source, create_open_index, ensure_partitions,
+                     wants_archived, initial_partition_sql)
+import click
+import profiling
+import serve
+from reminders import REMINDER_CHANGES_SQL, ReminderScheduler, build_sinks, leader_lock
+from revocation import REVOKED_TOKENS_SQL, RevocationError, TokenRevocations
+from fields import (FieldError, requested_fields, select_list, assignment_view_sql, with_overlay_key,
+                    strip, MEMBER_FIELDS, CHORE_FIELDS, ASSIGNMENT_VIEW_FIELDS)
 
 # ==================================================
 # APP SETUP
@@ -20,7 +35,35 @@ app = Flask(__name__)
 bcrypt = Bcrypt(app)
 app.config.update(
     SECRET_KEY=os.environ.get("SECRET_KEY", "supersecretkey123"),
-    JWT_EXP_HOURS=2
+    JWT_EXP_HOURS=2,
+    WRITE_BEHIND_INTERVAL=float(os.environ.get("WRITE_BEHIND_INTERVAL", "0.5")),
+    WRITE_BEHIND_MAX_PENDING=int(os.environ.get("WRITE_BEHIND_MAX_PENDING", "500")),
+    # comma-separated usernames; empty (the default) turns the /admin routes off
+    ADMIN_USERS={u.strip() for u in os.environ.get("ADMIN_USERS", "").split(",") if u.strip()},
+    PROFILE_DIR=os.environ.get("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "house_chores_profiles")),
+    PROFILE_TOKEN=os.environ.get("PROFILE_TOKEN"),
+    PROFILE_SAMPLE_RATE=float(os.environ.get("PROFILE_SAMPLE_RATE", "0")),
+    PROFILE_MODE=os.environ.get("PROFILE_MODE", "sample"),
+    PROFILE_MAX_FILES=int(os.environ.get("PROFILE_MAX_FILES", "200")),
+    PROFILE_MAX_AGE_HOURS=float(os.environ.get("PROFILE_MAX_AGE_HOURS", "168")),
+    REMINDERS_ENABLED=os.environ.get("REMINDERS", "1") == "1",
+    REMINDER_SINKS=os.environ.get("REMINDER_SINKS", "log"),
+    REMINDER_WEBHOOK_URL=os.environ.get("REMINDER_WEBHOOK_URL"),
+    REMINDER_HOUR=int(os.environ.get("REMINDER_HOUR", "8")),
+    REMINDER_REPEAT_HOURS=float(os.environ.get("REMINDER_REPEAT_HOURS", "24")),
+    REMINDER_OVERDUE_DAYS=int(os.environ.get("REMINDER_OVERDUE_DAYS", "1")),
+    REMINDER_LOCK=os.environ.get("REMINDER_LOCK", os.path.join(tempfile.gettempdir(), "house_chores_reminders.lock"))
+)
+
+# opt-in profiling: X-Profile/_profile=<PROFILE_TOKEN> or random sampling
+profiler = profiling.install(
+    app,
+    app.config["PROFILE_DIR"],
+    token=app.config["PROFILE_TOKEN"],
+    sample_rate=app.config["PROFILE_SAMPLE_RATE"],
+    mode=app.config["PROFILE_MODE"],
+    max_files=app.config["PROFILE_MAX_FILES"],
+    max_age=app.config["PROFILE_MAX_AGE_HOURS"] * 3600
 )
 
 # ==================================================
@@ -33,16 +76,110 @@ DB_CONFIG = {
     "database": "house_chores"
 }
 
-def get_db():
-    return MySQLdb.connect(
-        host=DB_CONFIG["host"],
-        user=DB_CONFIG["user"],
-        passwd=DB_CONFIG["password"],
-        db=DB_CONFIG["database"],
-        cursorclass=MySQLdb.cursors.DictCursor,
-        autocommit=False,
-        charset="utf8mb4"
-    )
+# DB_BACKEND=mysql (default) or sqlite, stored in SQLITE_PATH
+DB_BACKEND = os.environ.get("DB_BACKEND", "mysql")
+SQLITE_PATH = os.environ.get("SQLITE_PATH", "house_chores.db")
+
+# read replicas, e.g. DB_REPLICAS="replica1,replica2:3307"
+DB_REPLICAS = parse_replicas(os.environ.get("DB_REPLICAS", ""))
+
+storage = create_backend(DB_BACKEND, DB_CONFIG, sqlite_path=SQLITE_PATH,
+                         pool_size=int(os.environ.get("DB_POOL_SIZE", "10")))
+
+replica_backends = [storage.replica(host, port) for host, port in DB_REPLICAS]
+
+db_router = ReplicaRouter(
+    storage.connect,
+    [replica.connect for replica in replica_backends],
+    strategy=os.environ.get("DB_REPLICA_STRATEGY", "round_robin"),
+    max_lag=float(os.environ.get("DB_REPLICA_MAX_LAG", "5")),
+    sticky_seconds=float(os.environ.get("DB_STICKY_SECONDS", "5"))
+)
+
+def client_key():
+    if not has_request_context():
+        return None
+    return request.headers.get("Authorization") or session.get("token") or request.remote_addr
+
+def get_db(readonly=False):
+    # readonly connections may come from a replica; writes always use the primary
+    conn = db_router.connect(readonly, client_key() if readonly else None)
+    if readonly and has_request_context() and db_router.is_replica(conn):
+        g.replica_read = True
+    return conn
+
+def fetch_many(*queries):
+    # independent reads, run side by side instead of one round trip after another
+    connect = db_router.reader(client_key())  # one replica for all of them
+    if storage.name == "sqlite":
+        return run_sequentially(connect, queries)  # no round trips to overlap
+    return run_concurrently(connect, queries)
+
+@app.after_request
+def remember_writes(response):
+    # keep a client on the primary for a while after it changed something
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        db_router.mark_write(client_key())
+    return response
+
+# ==================================================
+# RESPONSE CACHE (shared by every worker on the host)
+# ==================================================
+response_cache = ResponseCache(
+    os.environ.get("RESPONSE_CACHE_PATH", os.path.join(tempfile.gettempdir(), "house_chores_cache.db")),
+    namespace="app",
+    max_bytes=int(os.environ.get("RESPONSE_CACHE_BYTES", str(64 * 1024 * 1024))),
+    ttl=float(os.environ.get("RESPONSE_CACHE_TTL", "60")),
+    enabled=os.environ.get("RESPONSE_CACHE", "1") == "1",
+    replica_lag=db_router.max_lag + db_router.lag_check_interval
+)
+
+# completion toggles are buffered in the same host-local file, so every
+# worker overlays them until they are written in batches
+completions = CompletionBuffer(
+    get_db,
+    response_cache.path,
+    interval=app.config["WRITE_BEHIND_INTERVAL"],
+    max_pending=app.config["WRITE_BEHIND_MAX_PENDING"]
+)
+
+# clients pinned to the primary after a write skip the shared cache, and so do
+# assignment views while any worker holds toggles the database doesn't have yet
+response_cache.bypass = lambda tables: db_router.is_sticky(client_key()) or (
+    "chore_assignments" in tables and completions.has_pending())
+response_cache.used_replica = lambda: g.get("replica_read", False)
+
+# revoked token ids; every worker polls the table into its own Bloom filter
+revocations = TokenRevocations(get_db, poll_interval=float(os.environ.get("REVOCATION_POLL_SECONDS", "2")))
+
+# ==================================================
+# REMINDERS (due/overdue open assignments)
+# ==================================================
+reminders = ReminderScheduler(
+    get_db,
+    build_sinks(app.config["REMINDER_SINKS"], app.config["REMINDER_WEBHOOK_URL"], app.logger),
+    hour=app.config["REMINDER_HOUR"],
+    repeat=app.config["REMINDER_REPEAT_HOURS"] * 3600,
+    overdue_days=app.config["REMINDER_OVERDUE_DAYS"],
+    poll_interval=float(os.environ.get("REMINDER_POLL_SECONDS", "1")),
+    overlay=completions.overlay,
+    enabled=app.config["REMINDERS_ENABLED"]
+)
+
+def completions_flushed(batch):
+    response_cache.bump("chore_assignments")
+    reminders.publish(batch)  # the toggles are in the database now
+
+completions.on_flush = completions_flushed
+
+def start_reminders():
+    # one scheduler per database (MySQL named lock) or host (SQLite file lock): whichever
+    # process holds it (app or login) runs it, the rest retry in the background
+    if app.config["REMINDERS_ENABLED"]:
+        try:
+            reminders.start(leader_lock(storage, app.config["REMINDER_LOCK"]))
+        except Exception as e:
+            app.logger.warning("reminder scheduler not started: %s", e)
 
 # ==================================================
 # DB INIT
@@ -77,6 +214,10 @@ def init_db():
         FOREIGN KEY (member_id) REFERENCES members(member_id),
         FOREIGN KEY (chore_id) REFERENCES chores(chore_id)
     )""")
+    cur.execute(ARCHIVE_TABLE_SQL)
+    cur.execute(REVOKED_TOKENS_SQL)
+    cur.execute(REMINDER_CHANGES_SQL)
+    create_open_index(cur)
     db.commit(); db.close()
 
 # ==================================================
@@ -92,12 +233,14 @@ def to_xml(data, root_name="items"):
             ET.SubElement(item, k).text = str(v)
     return ET.tostring(root, encoding="utf-8")
 
-def respond(data, root="items", status=200):
+def wants_xml():
     fmt = request.args.get("format", "").lower()
     accept = request.headers.get("Accept", "").lower()
+    return fmt == "xml" or accept == "application/xml"
 
+def respond(data, root="items", status=200):
     # XML response
-    if fmt == "xml" or accept == "application/xml":
+    if wants_xml():
         return app.response_class(
             to_xml(data, root),
             mimetype="application/xml",
@@ -107,6 +250,9 @@ def respond(data, root="items", status=200):
     # JSON response (default)
     return jsonify(data), status
 
+def fields_error(e):
+    return respond({"error": str(e), "allowed": ",".join(e.allowed)}, status=400)
+
 # ==================================================
 # JWT DECORATOR
 # ==================================================
@@ -121,9 +267,20 @@ def token_required(f):
         if not token:
             return respond({"error": "Token missing"}, 401)
         try:
-            jwt.decode(token, app.config["SECRET_KEY"], algorithms=["HS256"])
+            g.token_claims = jwt.decode(token, app.config["SECRET_KEY"], algorithms=["HS256"])
         except Exception:
             return respond({"error": "Invalid or expired token"}, 401)
+        if revocations.is_revoked(g.token_claims.get("jti")):
+            return respond({"error": "Token revoked"}, status=401)
+        return f(*args, **kwargs)
+    return decorated
+
+def admin_required(f):
+    @wraps(f)
+    @token_required
+    def decorated(*args, **kwargs):
+        if g.token_claims.get("user") not in app.config["ADMIN_USERS"]:
+            return respond({"error": "Admin only"}, status=403)
         return f(*args, **kwargs)
     return decorated
 
@@ -159,7 +316,7 @@ def login():
             <button>Login</button>
         </form>"""
     
-    db = get_db(); cur = db.cursor(MySQLdb.cursors.DictCursor)
+    db = get_db(); cur = db.cursor()
     cur.execute("SELECT * FROM users WHERE username=%s", (request.form["username"],))
     user = cur.fetchone(); db.close()
 
@@ -168,20 +325,38 @@ def login():
 
     token = jwt.encode({
         "user": user["username"],
+        "jti": uuid.uuid4().hex,
         "exp": datetime.datetime.utcnow() + datetime.timedelta(hours=2)
     }, app.config["SECRET_KEY"], algorithm="HS256")
 
     session["token"] = token
     return "<h3>Login Success</h3><a href='/members'>View Members</a>"
 
+def revoke_claims(claims):
+    # kept only until the token would have expired anyway
+    if not claims.get("jti"):
+        return False
+    return revocations.revoke(claims["jti"], datetime.datetime.utcfromtimestamp(claims["exp"]))
+
+@app.route("/logout", methods=["GET", "POST"])
+@token_required
+def logout():
+    session.pop("token", None)
+    try:
+        revoke_claims(g.token_claims)
+    except RevocationError:
+        return respond({"error": "Logout not recorded: the token stays valid until it expires"}, status=503)
+    return "<h3>Logged out</h3><a href='/login'>Login</a>"
+
 # ==================================================
 # MEMBERS CRUD + SEARCH
 # ==================================================
 @app.route("/members")
 @token_required
+@response_cache.cached("members")
 def members_page():
     keyword = request.args.get("search", "")
-    db = get_db(); cur = db.cursor(MySQLdb.cursors.DictCursor)
+    db = get_db(readonly=True); cur = db.cursor()
     if keyword:
         cur.execute("SELECT * FROM members WHERE name LIKE %s", (f"%{keyword}%",))
     else:
@@ -212,14 +387,19 @@ def members_page():
 
 @app.route("/api/members")
 @token_required
+@response_cache.cached("members")
 def members_api():
     keyword = request.args.get("search", "")
-    db = get_db(); cur = db.cursor(MySQLdb.cursors.DictCursor)
+    try:
+        columns = select_list(requested_fields(request.args, MEMBER_FIELDS), MEMBER_FIELDS)
+    except FieldError as e:
+        return fields_error(e)
+    db = get_db(readonly=True); cur = db.cursor()
 
     if keyword:
-        cur.execute("SELECT * FROM members WHERE name LIKE %s", (f"%{keyword}%",))
+        cur.execute(f"SELECT {columns} FROM members WHERE name LIKE %s", (f"%{keyword}%",))
     else:
-        cur.execute("SELECT * FROM members")
+        cur.execute(f"SELECT {columns} FROM members")
 
     data = cur.fetchall()
     db.close()
@@ -241,12 +421,13 @@ def add_member():
     db = get_db(); cur = db.cursor()
     cur.execute("INSERT INTO members (name) VALUES (%s)", (request.form["name"],))
     db.commit(); db.close()
+    response_cache.bump("members")
     return "<h3>Member added</h3><a href='/members'>Back</a>"
 
 @app.route("/members/edit/<int:id>", methods=["GET", "POST"])
 @token_required
 def edit_member(id):
-    db = get_db(); cur = db.cursor(MySQLdb.cursors.DictCursor)
+    db = get_db(readonly=request.method == "GET"); cur = db.cursor()
     if request.method == "GET":
         cur.execute("SELECT * FROM members WHERE member_id=%s", (id,))
         member = cur.fetchone(); db.close()
@@ -260,6 +441,7 @@ def edit_member(id):
         """
     cur.execute("UPDATE members SET name=%s WHERE member_id=%s", (request.form["name"], id))
     db.commit(); db.close()
+    response_cache.bump("members")
     return "<h3>Member updated</h3><a href='/members'>Back</a>"
 
 @app.route("/members/delete/<int:id>", methods=["POST"])
@@ -268,6 +450,7 @@ def delete_member(id):
     db = get_db(); cur = db.cursor()
     cur.execute("DELETE FROM members WHERE member_id=%s", (id,))
     db.commit(); db.close()
+    response_cache.bump("members")
     return "<h3>Member deleted</h3><a href='/members'>Back</a>"
 
 # ==================================================
@@ -275,9 +458,10 @@ def delete_member(id):
 # ==================================================
 @app.route("/chores")
 @token_required
+@response_cache.cached("chores")
 def chores_page():
     keyword = request.args.get("search", "")
-    db = get_db(); cur = db.cursor(MySQLdb.cursors.DictCursor)
+    db = get_db(readonly=True); cur = db.cursor()
     if keyword:
         cur.execute("SELECT * FROM chores WHERE chore_name LIKE %s", (f"%{keyword}%",))
     else:
@@ -323,12 +507,13 @@ def add_chore():
     cur.execute("INSERT INTO chores (chore_name, frequency) VALUES (%s,%s)",
                 (request.form["chore_name"], request.form["frequency"]))
     db.commit(); db.close()
+    response_cache.bump("chores")
     return "<h3>Chore added</h3><a href='/chores'>Back</a>"
 
 @app.route("/chores/edit/<int:id>", methods=["GET", "POST"])
 @token_required
 def edit_chore(id):
-    db = get_db(); cur = db.cursor(MySQLdb.cursors.DictCursor)
+    db = get_db(readonly=request.method == "GET"); cur = db.cursor()
     if request.method == "GET":
         cur.execute("SELECT * FROM chores WHERE chore_id=%s", (id,))
         chore = cur.fetchone(); db.close()
@@ -344,6 +529,7 @@ def edit_chore(id):
     cur.execute("UPDATE chores SET chore_name=%s, frequency=%s WHERE chore_id=%s",
                 (request.form["chore_name"], request.form["frequency"], id))
     db.commit(); db.close()
+    response_cache.bump("chores")
     return "<h3>Chore updated</h3><a href='/chores'>Back</a>"
 
 @app.route("/chores/delete/<int:id>", methods=["POST"])
@@ -352,6 +538,7 @@ def delete_chore(id):
     db = get_db(); cur = db.cursor()
     cur.execute("DELETE FROM chores WHERE chore_id=%s", (id,))
     db.commit(); db.close()
+    response_cache.bump("chores")
     return "<h3>Chore deleted</h3><a href='/chores'>Back</a>"
 
 # ==================================================
@@ -359,13 +546,15 @@ def delete_chore(id):
 # ==================================================
 @app.route("/assignments")
 @token_required
+@response_cache.cached("chore_assignments", "members", "chores")
 def assignments_page():
     keyword = request.args.get("search", "")
-    db = get_db(); cur = db.cursor(MySQLdb.cursors.DictCursor)
+    db = get_db(readonly=True); cur = db.cursor()
     
-    sql = """
+    # only the hot table unless ?include_archived=1
+    sql = f"""
         SELECT a.assignment_id, m.name as member_name, c.chore_name, c.frequency, a.assigned_date, a.is_completed
-        FROM chore_assignments a
+        FROM {assignments_source(wants_archived(request.args))} a
         JOIN members m ON a.member_id = m.member_id
         JOIN chores c ON a.chore_id = c.chore_id
     """
@@ -375,7 +564,7 @@ def assignments_page():
     else:
         cur.execute(sql)
     
-    assignments = cur.fetchall(); db.close()
+    assignments = completions.overlay(cur.fetchall()); db.close()
     
     return render_template_string("""
 <h1>Chore Assignments</h1>
@@ -383,6 +572,7 @@ def assignments_page():
     <input name="search" placeholder="Search assignments" value="{{ request.args.get('search', '') }}">
     <button>Search</button>
     <a href="/assignments">Reset</a>
+<a href="/assignments?include_archived=1">Include archived</a>
 </form>
 <a href="/assignments/add">➕ Add Assignment</a> | <a href="/members">Members</a> | <a href="/chores">Chores</a>
 <hr>
@@ -401,11 +591,8 @@ def assignments_page():
 @app.route("/assignments/add", methods=["GET", "POST"])
 @token_required
 def add_assignment():
-    db = get_db(); cur = db.cursor(MySQLdb.cursors.DictCursor)
     if request.method == "GET":
-        cur.execute("SELECT * FROM members"); members = cur.fetchall()
-        cur.execute("SELECT * FROM chores"); chores = cur.fetchall()
-        db.close()
+        members, chores = fetch_many(("SELECT * FROM members", ()), ("SELECT * FROM chores", ()))
         options_members = "".join([f"<option value='{m['member_id']}'>{m['name']}</option>" for m in members])
         options_chores = "".join([f"<option value='{c['chore_id']}'>{c['chore_name']}</option>" for c in chores])
         return f"""
@@ -420,21 +607,26 @@ def add_assignment():
         <a href="/assignments">Back</a>
         """
     is_completed = 1 if request.form.get("is_completed") == "on" else 0
+    db = get_db(); cur = db.cursor()
     cur.execute("INSERT INTO chore_assignments (member_id, chore_id, assigned_date, is_completed) VALUES (%s,%s,%s,%s)",
                 (request.form["member_id"], request.form["chore_id"], request.form["assigned_date"], is_completed))
+    reminders.publish([cur.lastrowid], cur)
     db.commit(); db.close()
+    response_cache.bump("chore_assignments")
     return "<h3>Assignment added</h3><a href='/assignments'>Back</a>"
 
 @app.route("/assignments/edit/<int:id>", methods=["GET", "POST"])
 @token_required
 def edit_assignment(id):
-    db = get_db(); cur = db.cursor(MySQLdb.cursors.DictCursor)
     if request.method == "GET":
-        cur.execute("SELECT * FROM chore_assignments WHERE assignment_id=%s", (id,))
-        assignment = cur.fetchone()
-        cur.execute("SELECT * FROM members"); members = cur.fetchall()
-        cur.execute("SELECT * FROM chores"); chores = cur.fetchall()
-        db.close()
+        found, members, chores = fetch_many(
+            ("SELECT * FROM chore_assignments WHERE assignment_id=%s", (id,)),
+            ("SELECT * FROM members", ()),
+            ("SELECT * FROM chores", ())
+        )
+        assignment = found[0] if found else None
+        if assignment:
+            completions.overlay([assignment])
         options_members = "".join([f"<option value='{m['member_id']}' {'selected' if m['member_id']==assignment['member_id'] else ''}>{m['name']}</option>" for m in members])
         options_chores = "".join([f"<option value='{c['chore_id']}' {'selected' if c['chore_id']==assignment['chore_id'] else ''}>{c['chore_name']}</option>" for c in chores])
         checked = "checked" if assignment["is_completed"] else ""
@@ -450,36 +642,128 @@ def edit_assignment(id):
         <a href="/assignments">Back</a>
         """
     is_completed = 1 if request.form.get("is_completed") == "on" else 0
+    completions.discard(id)
+    db = get_db(); cur = db.cursor()
     cur.execute("""
         UPDATE chore_assignments 
         SET member_id=%s, chore_id=%s, assigned_date=%s, is_completed=%s 
         WHERE assignment_id=%s
     """, (request.form["member_id"], request.form["chore_id"], request.form["assigned_date"], is_completed, id))
+    reminders.publish([id], cur)
     db.commit(); db.close()
+    response_cache.bump("chore_assignments")
     return "<h3>Assignment updated</h3><a href='/assignments'>Back</a>"
 
 @app.route("/assignments/delete/<int:id>", methods=["POST"])
 @token_required
 def delete_assignment(id):
+    completions.discard(id)
     db = get_db(); cur = db.cursor()
     cur.execute("DELETE FROM chore_assignments WHERE assignment_id=%s", (id,))
+    reminders.publish([id], cur)
     db.commit(); db.close()
+    response_cache.bump("chore_assignments")
     return "<h3>Assignment deleted</h3><a href='/assignments'>Back</a>"
 
+@app.route("/api/assignments/<int:id>/complete", methods=["POST"])
+@token_required
+def toggle_assignment(id):
+    # explicit value if given, otherwise flip the current (pending or stored) one
+    data = request.get_json(silent=True) or request.form or {}
+    value = data.get("is_completed")
+    current = completions.get(id)
+    if current is None:
+        # nothing pending, so the row has to exist
+        db = get_db(); cur = db.cursor()
+        cur.execute("SELECT is_completed FROM chore_assignments WHERE assignment_id=%s", (id,))
+        row = cur.fetchone(); db.close()
+        if not row:
+            return respond({"error": "Assignment not found"}, status=404)
+        current = row["is_completed"]
+    if value is None:
+        is_completed = 0 if current else 1
+    else:
+        is_completed = 1 if str(value).lower() in ("1", "true", "on", "yes") else 0
+    completions.put(id, is_completed)
+    return respond({"assignment_id": id, "is_completed": is_completed}, root="assignment", status=202)
+
+# ==================================================
+# AUTO-ASSIGNMENT
+# ==================================================
+def build_plan(cur):
+    # JSON body: start, days, member_ids, chore_ids, unavailable, weights
+    data = request.get_json(silent=True) or {}
+    start = datetime.date.fromisoformat(data.get("start") or datetime.date.today().isoformat())
+    days = int(data.get("days", 7))
+    if not 1 <= days <= 366:
+        raise ValueError("days must be between 1 and 366")
+    members, chores, history, load = load_planning_data(
+        cur, start, days, data.get("member_ids"), data.get("chore_ids"), data.get("weights"))
+    plan, unassigned, loads = plan_assignments(
+        members, chores, start, days, data.get("unavailable"), history, load, data.get("weights"))
+    summary = {
+        "start": start.isoformat(),
+        "days": days,
+        "assignments": len(plan),
+        "unassigned": len(unassigned),
+        "members": len(loads),
+        "load_min": min(loads.values(), default=0),
+        "load_max": max(loads.values(), default=0)
+    }
+    return plan, unassigned, summary
+
+@app.route("/api/assignments/auto/preview", methods=["POST"])
+@token_required
+def auto_assign_preview():
+    db = get_db(); cur = db.cursor()
+    try:
+        plan, unassigned, summary = build_plan(cur)
+    except (TypeError, ValueError) as e:
+        return respond({"error": str(e)}, status=400)
+    finally:
+        db.close()
+    if wants_xml():
+        # to_xml only does flat rows: one <item> per planned slot
+        return respond(plan, root="plan")
+    return respond({"summary": summary, "plan": plan, "unassigned": unassigned}, root="preview")
+
+@app.route("/api/assignments/auto", methods=["POST"])
+@token_required
+def auto_assign():
+    db = get_db(); cur = db.cursor()
+    try:
+        plan, unassigned, summary = build_plan(cur)
+        summary["inserted"] = insert_plan(cur, plan)
+        if plan:
+            # new ids aren't returned by the batch insert; log the planned range instead
+            reminders.publish_range(cur, min(p["assigned_date"] for p in plan), max(p["assigned_date"] for p in plan))
+        db.commit()
+        response_cache.bump("chore_assignments")
+    except (TypeError, ValueError) as e:
+        return respond({"error": str(e)}, status=400)
+    finally:
+        db.close()
+    return respond(summary, root="rota", status=201)
+
 #=================================================
 #JSON AND XML FORMAT
 #================================================
 
 @app.route("/api/chores")
 @token_required
+@response_cache.cached("chores")
 def chores_api():
     keyword = request.args.get("search", "")
-    db = get_db(); cur = db.cursor(MySQLdb.cursors.DictCursor)
+    try:
+        columns = select_list(requested_fields(request.args, CHORE_FIELDS), CHORE_FIELDS)
+    except FieldError as e:
+        return fields_error(e)
+    db = get_db(readonly=True); cur = db.cursor()
 
     if keyword:
-        cur.execute("SELECT * FROM chores WHERE chore_name LIKE %s", (f"%{keyword}%",))
+        cur.execute(f"SELECT {columns} FROM chores WHERE chore_name LIKE %s", (f"%{keyword}%",))
     else:
-        cur.execute("SELECT * FROM chores")
+        cur.execute(f"SELECT {columns} FROM chores")
 
     data = cur.fetchall()
     db.close()
@@ -487,23 +771,79 @@ def chores_api():
 
 @app.route("/api/assignments")
 @token_required
+@response_cache.cached("chore_assignments", "members", "chores")
 def assignments_api():
-    db = get_db(); cur = db.cursor(MySQLdb.cursors.DictCursor)
+    try:
+        fields = requested_fields(request.args, ASSIGNMENT_VIEW_FIELDS)
+    except FieldError as e:
+        return fields_error(e)
+    db = get_db(readonly=True); cur = db.cursor()
 
-    cur.execute("""
-        SELECT a.assignment_id, m.name AS member_name,
-               c.chore_name, c.frequency,
-               a.assigned_date, a.is_completed
-        FROM chore_assignments a
-        JOIN members m ON a.member_id = m.member_id
-        JOIN chores c ON a.chore_id = c.chore_id
-    """)
+    # only the hot table unless ?include_archived=1; joins only for requested fields
+    cur.execute(assignment_view_sql(with_overlay_key(fields),
+                                    assignments_source(wants_archived(request.args))))
 
-    data = cur.fetchall()
+    data = strip(completions.overlay(cur.fetchall()), fields)
     db.close()
     return respond(data, root="assignments")
 
 
+@app.route("/api/cache/stats")
+@token_required
+def cache_stats():
+    return respond(response_cache.stats(), root="cache")
+
+# ==================================================
+# ADMIN: PROFILES
+# ==================================================
+@app.route("/admin/profiles")
+@admin_required
+def list_profiles():
+    return respond(profiler.list_profiles(), root="profiles")
+
+@app.route("/admin/profiles/<path:name>")
+@admin_required
+def get_profile(name):
+    return send_from_directory(app.config["PROFILE_DIR"], name, mimetype="text/plain")
+
+# ==================================================
+# ADMIN: TOKEN REVOCATION
+# ==================================================
+@app.route("/admin/tokens/revoke", methods=["POST"])
+@admin_required
+def revoke_token():
+    # {"token": "<jwt>"}, or {"jti": "..."} held for the longest token lifetime
+    data = request.get_json(silent=True) or request.form or {}
+    if data.get("token"):
+        try:
+            claims = jwt.decode(data["token"], app.config["SECRET_KEY"], algorithms=["HS256"],
+                                options={"verify_exp": False})
+        except jwt.InvalidTokenError:
+            return respond({"error": "Invalid token"}, status=400)
+    elif data.get("jti"):
+        claims = {"jti": data["jti"],
+                  "exp": (datetime.datetime.now(datetime.timezone.utc)
+                          + datetime.timedelta(hours=app.config["JWT_EXP_HOURS"])).timestamp()}
+    else:
+        return respond({"error": "token or jti required"}, status=400)
+    if not claims.get("jti"):
+        return respond({"error": "Token has no jti and can't be revoked"}, status=400)
+    try:
+        revoked = revoke_claims(claims)
+    except RevocationError:
+        return respond({"error": "Revocation not recorded"}, status=503)
+    return respond({"jti": claims["jti"], "revoked": revoked}, root="revocation")
+
+@app.route("/admin/tokens/revocations")
+@admin_required
+def revocation_status():
+    return respond(revocations.status(), root="revocations")
+
+@app.route("/admin/reminders/metrics")
+@admin_required
+def reminder_metrics():
+    return respond(reminders.metrics(), root="reminders")
+
 # ==================================================
 # HOME
 # ==================================================
@@ -515,9 +855,65 @@ def index():
     <a href='/register'>Register</a>
     """
 
+# ==================================================
+# MAINTENANCE COMMANDS
+# ==================================================
+@app.cli.command("archive-assignments")
+@click.option("--days", default=int(os.environ.get("ARCHIVE_AFTER_DAYS", "180")),
+              help="Archive completed assignments older than this many days.")
+@click.option("--batch", default=1000, help="Rows moved per transaction.")
+@click.option("--pause", default=0.05, help="Seconds to sleep between batches.")
+def archive_assignments_command(days, batch, pause):
+    """Move old completed assignments to chore_assignments_archive."""
+    moved = archive_completed(storage.connect, days, batch, pause)
+    if moved:
+        response_cache.bump("chore_assignments")
+    click.echo(f"archived {moved} assignments older than {days} days")
+    if storage.name == "mysql":
+        db = storage.connect(); cur = db.cursor()
+        added = ensure_partitions(cur)
+        db.close()
+        if added:
+            click.echo("added partitions " + ", ".join(added))
+
+@app.cli.command("purge-revoked-tokens")
+def purge_revoked_tokens_command():
+    """Delete revoked token ids whose tokens have expired (run from cron)."""
+    click.echo(f"purged {revocations.purge_expired()} expired revoked tokens")
+
+@app.cli.command("partition-sql")
+def partition_sql_command():
+    """Print the PARTITION BY statement for partition_assignments.sql, dated this month."""
+    click.echo(initial_partition_sql())
+
+# ==================================================
+# PRODUCTION SERVER (flask --app app serve)
+# ==================================================
+def worker_started():
+    # drop connections inherited from the master, then open a few per worker up front
+    response_cache.after_fork()
+    completions.after_fork()
+    revocations.after_fork()
+    for backend in [storage] + replica_backends:
+        backend.after_fork()
+        if backend.pool is not None:
+            try:
+                backend.pool.warm_up(int(os.environ.get("DB_POOL_WARM", "2")))
+            except Exception as e:
+                app.logger.warning("connection pool warm-up failed: %s", e)
+    start_reminders()
+
+def worker_stopping():
+    reminders.stop()
+    completions.close()
+
+app.cli.add_command(serve.command(app, on_start=init_db, on_fork=worker_started, on_exit=worker_stopping))
+
 # ==================================================
 # RUN APP
 # ==================================================
 if __name__ == "__main__":
     init_db()
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_reminders()  # in the reloader's child, the process that serves requests
     app.run(debug=True)
@@ -0,0 +1,161 @@
+# ==================================================
+# HOT/COLD ASSIGNMENTS
+# Completed assignments older than a cut-off move to
+# chore_assignments_archive in small batches, so the
+# live table only holds the working set.
+# ==================================================
+
+import datetime
+import time
+
+COLUMNS = "assignment_id, member_id, chore_id, assigned_date, is_completed"
+
+ARCHIVE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS chore_assignments_archive (
+    assignment_id INT PRIMARY KEY,
+    member_id INT,
+    chore_id INT,
+    assigned_date DATE,
+    is_completed TINYINT(1),
+    archived_at DATETIME
+)"""
+
+# open assignments by date: archival and reminder scans
+OPEN_ASSIGNMENTS_INDEX_SQL = \
+    "CREATE INDEX idx_assignments_open ON chore_assignments (is_completed, assigned_date)"
+
+
+def create_open_index(cur):
+    # MySQL has no CREATE INDEX IF NOT EXISTS
+    try:
+        cur.execute(OPEN_ASSIGNMENTS_INDEX_SQL)
+    except Exception:
+        pass
+
+
+def wants_archived(args):
+    return str(args.get("include_archived", "")).lower() in ("1", "true", "yes", "on")
+
+def assignments_source(include_archived=False):
+    """Table expression for assignment reads: the hot table, or hot + archive."""
+    if not include_archived:
+        return "chore_assignments"
+    return (f"(SELECT {COLUMNS} FROM chore_assignments "
+            f"UNION ALL SELECT {COLUMNS} FROM chore_assignments_archive)")
+
+
+def archive_completed(connect, older_than_days=180, batch_size=1000, pause=0.0, today=None):
+    """Move completed assignments dated before the cut-off into the archive.
+
+    Each batch is its own short transaction (lock, copy, delete, commit), so
+    row locks are held only for one batch. Batches walk idx_assignments_open
+    in (assigned_date, assignment_id) order and each starts after the last
+    row of the one before, so no batch sorts or locks more than it moves.
+    The copy and the delete repeat the completed/cut-off test, so a row
+    reopened after it was picked stays put. Returns the number of rows moved.
+    """
+    cutoff = (today or datetime.date.today()) - datetime.timedelta(days=older_than_days)
+    moved = 0
+    after = None  # (assigned_date, assignment_id) of the previous batch's last row
+    while True:
+        db = connect(); cur = db.cursor()
+        try:
+            keyset, params = "", [cutoff]
+            if after:
+                keyset = " AND (assigned_date > %s OR (assigned_date = %s AND assignment_id > %s))"
+                params += [after[0], after[0], after[1]]
+            cur.execute(
+                "SELECT assignment_id, assigned_date FROM chore_assignments "
+                f"WHERE is_completed = 1 AND assigned_date < %s{keyset} "
+                "ORDER BY assigned_date, assignment_id LIMIT %s FOR UPDATE",
+                params + [batch_size]
+            )
+            picked = cur.fetchall()
+            ids = [r["assignment_id"] for r in picked]
+            if not ids:
+                db.commit()
+                return moved
+            marks = ",".join(["%s"] * len(ids))
+            still_done = f"assignment_id IN ({marks}) AND is_completed = 1 AND assigned_date < %s"
+            cur.execute(
+                f"INSERT INTO chore_assignments_archive ({COLUMNS}, archived_at) "
+                f"SELECT {COLUMNS}, NOW() FROM chore_assignments WHERE {still_done}",
+                ids + [cutoff]
+            )
+            cur.execute(f"DELETE FROM chore_assignments WHERE {still_done}", ids + [cutoff])
+            deleted = cur.rowcount
+            db.commit()
+            after = (picked[-1]["assigned_date"], picked[-1]["assignment_id"])
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        moved += deleted
+        if len(ids) < batch_size:
+            return moved
+        if pause:
+            time.sleep(pause)
+
+
+# ==================================================
+# MYSQL MONTHLY PARTITIONS
+# ==================================================
+def partition_name(month):
+    return f"p{month:%Y%m}"
+
+def next_month(month):
+    return (month.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+
+def initial_partition_sql(today=None):
+    """The PARTITION BY statement for partition_assignments.sql.
+
+    MySQL only takes constant partition bounds, so the p_old boundary (the
+    first day of the current month) is written out as a literal date.
+    """
+    boundary = (today or datetime.date.today()).replace(day=1)
+    return (
+        "ALTER TABLE chore_assignments\n"
+        "  PARTITION BY RANGE (TO_DAYS(assigned_date)) (\n"
+        f"    PARTITION p_old VALUES LESS THAN (TO_DAYS('{boundary.isoformat()}')),\n"
+        "    PARTITION pmax VALUES LESS THAN MAXVALUE\n"
+        "  );"
+    )
+
+def ensure_partitions(cur, months_ahead=3, today=None):
+    """Split pmax so monthly partitions exist up to months_ahead from now.
+
+    Only applies once partition_assignments.sql has been run; on an
+    unpartitioned table (or SQLite) it does nothing and returns [].
+    """
+    cur.execute(
+        "SELECT PARTITION_NAME AS name FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'chore_assignments' "
+        "AND PARTITION_NAME IS NOT NULL"
+    )
+    existing = {r["name"] for r in cur.fetchall()}
+    if "pmax" not in existing:
+        return []
+    # new ranges can only be carved off the end, after the newest month
+    this_month = (today or datetime.date.today()).replace(day=1)
+    last = this_month
+    for _ in range(months_ahead):
+        last = next_month(last)
+    months = sorted(datetime.date(int(n[1:5]), int(n[5:7]), 1)
+                    for n in existing if len(n) == 7 and n[1:].isdigit())
+    month = next_month(months[-1]) if months else this_month
+    wanted = []
+    while month <= last:
+        wanted.append(month)
+        month = next_month(month)
+    if not wanted:
+        return []
+    parts = ", ".join(
+        f"PARTITION {partition_name(m)} VALUES LESS THAN (TO_DAYS('{next_month(m).isoformat()}'))"
+        for m in wanted
+    )
+    cur.execute(
+        f"ALTER TABLE chore_assignments REORGANIZE PARTITION pmax INTO "
+        f"({parts}, PARTITION pmax VALUES LESS THAN MAXVALUE)"
+    )
+    return [partition_name(m) for m in wanted]
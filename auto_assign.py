@@ -0,0 +1,181 @@
+# ==================================================
+# FAIR WORKLOAD AUTO-ASSIGNMENT
+# Builds a chore rota that spreads weighted workload
+# evenly across members using a min-heap of loads.
+# ==================================================
+
+import datetime
+import heapq
+from collections import defaultdict
+
+# days between occurrences; unknown frequencies are treated as weekly
+FREQUENCY_DAYS = {
+    "daily": 1,
+    "weekly": 7,
+    "biweekly": 14,
+    "fortnightly": 14,
+    "monthly": 30,
+}
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+
+def frequency_days(frequency):
+    return FREQUENCY_DAYS.get((frequency or "").strip().lower(), 7)
+
+def chore_weight(weights, chore_id):
+    # JSON bodies give string keys, callers may give int ones
+    weights = weights or {}
+    return float(weights.get(chore_id, weights.get(str(chore_id), 1)))
+
+def parse_date(value):
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value))
+
+def parse_unavailable(unavailable):
+    """{member_id: ["2025-01-04", "sat", ...]} -> {member_id: (dates, weekdays)}"""
+    parsed = {}
+    for member_id, entries in (unavailable or {}).items():
+        dates, weekdays = set(), set()
+        for entry in entries:
+            key = str(entry).strip().lower()[:3]
+            if key in WEEKDAYS:
+                weekdays.add(WEEKDAYS.index(key))
+            else:
+                dates.add(parse_date(entry))
+        parsed[int(member_id)] = (dates, weekdays)
+    return parsed
+
+
+def occurrences(chores, start, days, weights=None):
+    """(date, weight, chore_id) for every time a chore falls due in the window.
+
+    Each occurrence counts `weight` (default 1) towards a member's load, so a
+    daily chore weighs seven times a weekly one over a week.
+    """
+    slots = []
+    for chore in chores:
+        step = frequency_days(chore.get("frequency"))
+        weight = chore_weight(weights, chore["chore_id"])
+        for offset in range(0, days, step):
+            slots.append((start + datetime.timedelta(days=offset), weight, chore["chore_id"]))
+    # day by day, heaviest first (longest-processing-time order)
+    slots.sort(key=lambda s: (s[0], -s[1], s[2]))
+    return slots
+
+
+def plan_assignments(member_ids, chores, start, days=7, unavailable=None,
+                     history=(), existing_load=None, weights=None):
+    """Return (plan, unassigned, loads).
+
+    member_ids     members to rota
+    chores         rows with chore_id and frequency
+    unavailable    {member_id: [iso dates or weekday names]}
+    history        (member_id, chore_id, date) already on record; used for the
+                   no-same-chore-on-consecutive-days rule and to skip slots
+                   that are already assigned
+    existing_load  {member_id: load} already carried in the window
+    """
+    start = parse_date(start)
+    unavailable = parse_unavailable(unavailable)
+    existing_load = existing_load or {}
+
+    done_on = set()          # (member_id, chore_id, date)
+    taken = set()            # (chore_id, date)
+    for member_id, chore_id, date in history:
+        date = parse_date(date)
+        done_on.add((member_id, chore_id, date))
+        taken.add((chore_id, date))
+
+    # heap of (load, member_id); ties go to the lowest id for stable plans
+    heap = [(float(existing_load.get(m, 0)), m) for m in member_ids]
+    heapq.heapify(heap)
+    loads = {m: load for load, m in heap}
+
+    def blocked(member_id, date):
+        entry = unavailable.get(member_id)
+        return bool(entry) and (date in entry[0] or date.weekday() in entry[1])
+
+    plan, unassigned = [], []
+    parked, parked_on = [], None  # members blocked for the whole of parked_on
+    for date, weight, chore_id in occurrences(chores, start, days, weights):
+        if date != parked_on:
+            # a new day: blocked members go back in, each is parked at most once per day
+            for entry in parked:
+                heapq.heappush(heap, entry)
+            parked, parked_on = [], date
+        if (chore_id, date) in taken:
+            continue
+        yesterday = date - datetime.timedelta(days=1)
+        skipped, chosen = [], None
+        while heap:
+            load, member_id = heapq.heappop(heap)
+            if blocked(member_id, date):
+                parked.append((load, member_id))
+            elif (member_id, chore_id, yesterday) in done_on:
+                skipped.append((load, member_id))  # free for the day's other chores
+            else:
+                chosen = member_id
+                break
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+        if chosen is None:
+            unassigned.append({"chore_id": chore_id, "assigned_date": date.isoformat()})
+            continue
+        loads[chosen] += weight
+        heapq.heappush(heap, (loads[chosen], chosen))
+        done_on.add((chosen, chore_id, date))
+        taken.add((chore_id, date))
+        plan.append({"member_id": chosen, "chore_id": chore_id,
+                     "assigned_date": date.isoformat(), "weight": weight})
+    return plan, unassigned, loads
+
+
+# ==================================================
+# DATABASE HELPERS
+# ==================================================
+def load_planning_data(cur, start, days, member_ids=None, chore_ids=None, weights=None):
+    """Members, chores, history and carried load for the planning window.
+
+    Assignments already in the window count towards a member's load with
+    the same weights the plan uses.
+    """
+    start = parse_date(start)
+    end = start + datetime.timedelta(days=days - 1)
+
+    cur.execute("SELECT member_id FROM members")
+    members = [r["member_id"] for r in cur.fetchall()]
+    if member_ids:
+        wanted = {int(m) for m in member_ids}
+        members = [m for m in members if m in wanted]
+
+    cur.execute("SELECT chore_id, frequency FROM chores")
+    chores = list(cur.fetchall())
+    if chore_ids:
+        wanted = {int(c) for c in chore_ids}
+        chores = [c for c in chores if c["chore_id"] in wanted]
+
+    # the day before the window counts for the consecutive-days rule
+    cur.execute(
+        "SELECT member_id, chore_id, assigned_date FROM chore_assignments "
+        "WHERE assigned_date BETWEEN %s AND %s",
+        (start - datetime.timedelta(days=1), end)
+    )
+    history, existing_load = [], defaultdict(float)
+    for r in cur.fetchall():
+        history.append((r["member_id"], r["chore_id"], r["assigned_date"]))
+        if parse_date(r["assigned_date"]) >= start:
+            existing_load[r["member_id"]] += chore_weight(weights, r["chore_id"])
+    return members, chores, history, existing_load
+
+
+def insert_plan(cur, plan):
+    """Write the whole plan with one batched INSERT."""
+    if not plan:
+        return 0
+    cur.executemany(
+        "INSERT INTO chore_assignments (member_id, chore_id, assigned_date, is_completed) "
+        "VALUES (%s,%s,%s,0)",
+        [(p["member_id"], p["chore_id"], p["assigned_date"]) for p in plan]
+    )
+    return len(plan)
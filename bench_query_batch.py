@@ -0,0 +1,60 @@
+# ==================================================
+# FORM-LOAD FAN-OUT BENCHMARK
+# Usage: python bench_query_batch.py [requests] [rtt_ms]
+# Times the three edit-assignment queries run one after
+# another on one connection vs. fanned out on the pool.
+# rtt_ms adds a fixed delay per query to approximate a
+# remote server when only a local database is available.
+# ==================================================
+
+import statistics
+import sys
+import time
+
+from app import storage, init_db, DB_BACKEND
+from query_batch import run_concurrently, run_sequentially
+
+QUERIES = [
+    ("SELECT * FROM chore_assignments WHERE assignment_id=%s", (1,)),
+    ("SELECT * FROM members", ()),
+    ("SELECT * FROM chores", ()),
+]
+
+def with_rtt(connect, rtt):
+    if not rtt:
+        return connect
+    class Delayed:
+        def __init__(self, conn):
+            self.conn = conn
+        def cursor(self):
+            cur = self.conn.cursor()
+            execute = cur.execute
+            def delayed(sql, params=()):
+                time.sleep(rtt)
+                return execute(sql, params)
+            cur.execute = delayed
+            return cur
+        def close(self):
+            self.conn.close()
+    return lambda: Delayed(connect())
+
+def timed(fn, n):
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter(); fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def main(n=200, rtt_ms=0.0):
+    init_db()
+    connect = with_rtt(storage.connect, rtt_ms / 1000)
+    run_concurrently(connect, QUERIES)  # warm the pool and the threads
+    before = timed(lambda: run_sequentially(connect, QUERIES), n)
+    after = timed(lambda: run_concurrently(connect, QUERIES), n)
+    print(f"backend={DB_BACKEND} rtt_ms={rtt_ms} requests={n}")
+    print(f"sequential p50 {before:.2f} ms")
+    print(f"fan-out    p50 {after:.2f} ms")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+         float(sys.argv[2]) if len(sys.argv) > 2 else 0.0)
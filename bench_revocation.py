@@ -0,0 +1,91 @@
+# ==================================================
+# TOKEN REVOCATION OVERHEAD BENCHMARK
+# Usage: python bench_revocation.py [revoked_tokens] [checks]
+# Times the revocation check token_required adds on top of
+# jwt.decode, with the revoked_tokens table holding N live
+# entries (SQLite file in a temp dir), plus the background
+# work: a poll, and the rebuild once half the entries expire.
+# ==================================================
+
+import datetime
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+import jwt
+
+from revocation import REVOKED_TOKENS_SQL, TokenRevocations
+from storage import SQLiteBackend
+
+SECRET = "bench-secret-key-that-is-long-enough"
+
+def timed(fn, n):
+    samples = []
+    for i in range(n):
+        start = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+def main(revoked=10000, n=20000):
+    backend = SQLiteBackend(os.path.join(tempfile.mkdtemp(), "revoked.db"))
+    backend.executescript(REVOKED_TOKENS_SQL)
+    expires = datetime.datetime.utcnow() + datetime.timedelta(hours=2)
+    revoked_ids = [uuid.uuid4().hex for _ in range(revoked)]
+    db = backend.connect(); cur = db.cursor()
+    cur.executemany("INSERT INTO revoked_tokens (jti, expires_at, revoked_at) VALUES (%s,%s,%s)",
+                    [(jti, expires, datetime.datetime.utcnow()) for jti in revoked_ids])
+    db.commit(); db.close()
+
+    revocations = TokenRevocations(backend.connect, capacity=max(10000, 2 * revoked))
+    revocations.sync(force=True)
+    tokens = [jwt.encode({"user": "bench", "jti": uuid.uuid4().hex, "exp": expires}, SECRET, algorithm="HS256")
+              for _ in range(1000)]
+    live = [jwt.decode(t, SECRET, algorithms=["HS256"])["jti"] for t in tokens]
+
+    decode = lambda i: jwt.decode(tokens[i % 1000], SECRET, algorithms=["HS256"])
+    check = lambda i: revocations.is_revoked(live[i % 1000])
+    both = lambda i: revocations.is_revoked(decode(i)["jti"])
+    hit = lambda i: revocations.is_revoked(revoked_ids[i % revoked])
+
+    print(f"revoked entries={revoked} checks={n} filter={revocations.status()['filter_bits']} bits, "
+          f"{revocations.status()['filter_hashes']} hashes")
+    print(f"{'path':<34}{'p50 us':>10}{'p99 us':>10}")
+    for name, fn in [("jwt.decode only", decode), ("revocation check (live token)", check),
+                     ("decode + revocation check", both), ("revoked token (store lookup)", hit)]:
+        p50, p99 = timed(fn, n if fn is not hit else min(n, 2000))
+        print(f"{name:<34}{p50:>10.1f}{p99:>10.1f}")
+    stats = revocations.status()
+    print(f"bloom hits on live tokens: {stats['bloom_hits'] - stats['revoked_hits']} "
+          f"of {stats['checks'] - stats['revoked_hits']} checks")
+
+    # once per poll_interval, not per request
+    poll_p50, poll_p99 = timed(lambda i: revocations._poll(), 200)
+    print(f"{'poll (no new revocations)':<34}{poll_p50:>10.1f}{poll_p99:>10.1f}")
+    # half the entries expire: the next poll hands the rebuild to a thread
+    db = backend.connect(); cur = db.cursor()
+    cur.execute("UPDATE revoked_tokens SET expires_at = %s WHERE id <= %s",
+                (datetime.datetime.utcnow() + datetime.timedelta(seconds=1), revoked // 2))
+    db.commit(); db.close()
+    revocations.sync(force=True)
+    time.sleep(1.5)
+    revocations._next_poll = 0.0
+    start = time.perf_counter()
+    revocations.is_revoked(live[0])
+    trigger = (time.perf_counter() - start) * 1e6
+    during = timed(check, 2000) if revocations._rebuilder else (0.0, 0.0)
+    start = time.perf_counter()
+    if revocations._rebuilder:
+        revocations._rebuilder.join()
+    print(f"{'check that starts the rebuild':<34}{trigger:>10.1f}")
+    print(f"{'check while rebuilding':<34}{during[0]:>10.1f}{during[1]:>10.1f}")
+    print(f"rebuild finished {(time.perf_counter() - start) * 1000:.1f} ms later in the background; "
+          f"entries {revocations.status()['entries']} (was {revoked})")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 20000)
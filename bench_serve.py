@@ -0,0 +1,70 @@
+# ==================================================
+# SERVER THROUGHPUT BENCHMARK
+# Usage: python bench_serve.py http://127.0.0.1:8000/api/chores [clients] [seconds]
+# Each client is its own process holding one keep-alive
+# connection, so the load generator isn't GIL-bound.
+# A bearer token is minted with SECRET_KEY.
+# ==================================================
+
+import datetime
+import http.client
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from urllib.parse import urlsplit
+
+import jwt
+
+
+def client(url, token, seconds, results):
+    parts = urlsplit(url)
+    path = parts.path + ("?" + parts.query if parts.query else "")
+    headers = {"Authorization": f"Bearer {token}", "Connection": "keep-alive"}
+    conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=10)
+    done, errors, latencies = 0, 0, []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors += 1
+            if response.getheader("Connection", "").lower() == "close":
+                conn.close()
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+        done += 1
+        latencies.append((time.perf_counter() - start) * 1000)
+    results.put((done, errors, latencies))
+
+
+def main(url, clients=16, seconds=10):
+    token = jwt.encode({"user": "bench", "exp": datetime.datetime.utcnow() + datetime.timedelta(hours=1)},
+                       os.environ.get("SECRET_KEY", "supersecretkey123"), algorithm="HS256")
+    results = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=client, args=(url, token, seconds, results))
+             for _ in range(clients)]
+    for p in procs:
+        p.start()
+    collected = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    total = sum(c[0] for c in collected)
+    errors = sum(c[1] for c in collected)
+    latencies = sorted(l for c in collected for l in c[2])
+    print(f"{url} clients={clients} seconds={seconds}")
+    print(f"requests {total}  errors {errors}  throughput {total / seconds:.0f} req/s")
+    if latencies:
+        print(f"latency p50 {statistics.median(latencies):.1f} ms  "
+              f"p99 {latencies[int(len(latencies) * 0.99) - 1]:.1f} ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1],
+         int(sys.argv[2]) if len(sys.argv) > 2 else 16,
+         int(sys.argv[3]) if len(sys.argv) > 3 else 10)
@@ -0,0 +1,91 @@
+# ==================================================
+# STORAGE LATENCY BENCHMARK
+# Usage: python bench_storage.py [requests] --compare
+#        DB_BACKEND=sqlite python bench_storage.py [requests]
+# Drives the real routes through Flask's test client so only
+# the storage backend differs between runs. --compare runs
+# each backend in its own process (response cache off) and
+# prints them side by side.
+# ==================================================
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+BACKENDS = ["sqlite", "mysql"]
+
+ROUTES = [
+    ("GET", "/api/members", None),
+    ("GET", "/api/chores?search=a", None),
+    ("GET", "/api/assignments", None),
+    ("GET", "/assignments", None),
+    ("POST", "/members/add", lambda i: {"name": f"bench-{uuid.uuid4().hex[:12]}"}),
+]
+
+def timed(fn, n):
+    samples = []
+    for i in range(n):
+        start = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+def measure(n):
+    from app import app, init_db, DB_BACKEND
+    init_db()
+    client = app.test_client()
+    user = f"bench-{uuid.uuid4().hex[:8]}"
+    client.post("/register", data={"username": user, "password": "bench"})
+    client.post("/login", data={"username": user, "password": "bench"})
+
+    results = {}
+    for method, path, form in ROUTES:
+        if method == "GET":
+            fn = lambda i: client.get(path)
+        else:
+            fn = lambda i: client.post(path, data=form(i))
+        results[f"{method} {path}"] = timed(fn, n)
+    return DB_BACKEND, results
+
+def main(n=200):
+    backend, results = measure(n)
+    print(f"backend={backend} requests/route={n}")
+    print(f"{'route':<28}{'p50 ms':>10}{'p95 ms':>10}")
+    for route, (p50, p95) in results.items():
+        print(f"{route:<28}{p50:>10.2f}{p95:>10.2f}")
+
+def compare(n=200):
+    runs = {}
+    for backend in BACKENDS:
+        env = dict(os.environ, DB_BACKEND=backend, RESPONSE_CACHE="0", REMINDERS="0",
+                   SQLITE_PATH=os.path.join(tempfile.mkdtemp(), "bench.db"))
+        proc = subprocess.run([sys.executable, __file__, str(n), "--json"], env=env,
+                              capture_output=True, text=True)
+        if proc.returncode == 0:
+            runs[backend] = json.loads(proc.stdout.strip().splitlines()[-1])
+        else:
+            runs[backend] = None
+            reason = (proc.stderr.strip().splitlines() or ["failed"])[-1]
+            print(f"{backend}: not measured ({reason})")
+    print(f"requests/route={n}  p50 / p95 ms")
+    print(f"{'route':<28}" + "".join(f"{b:>20}" for b in BACKENDS))
+    for method, path, _ in ROUTES:
+        route = f"{method} {path}"
+        cells = [f"{r[route][0]:.2f} / {r[route][1]:.2f}" if r else "n/a" for r in runs.values()]
+        print(f"{route:<28}" + "".join(f"{c:>20}" for c in cells))
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    n = int(args[0]) if args else 200
+    if "--compare" in sys.argv:
+        compare(n)
+    elif "--json" in sys.argv:
+        print(json.dumps(measure(n)[1]))
+    else:
+        main(n)
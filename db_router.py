@@ -0,0 +1,205 @@
+# ==================================================
+# READ-REPLICA ROUTING
+# Sends read-only work to replicas, everything else
+# to the primary.
+# ==================================================
+
+import itertools
+import threading
+import time
+
+
+def mysql_replica_lag(conn):
+    """Seconds behind the source, or None if replication is not running."""
+    cur = conn.cursor()
+    try:
+        try:
+            cur.execute("SHOW REPLICA STATUS")
+        except Exception:
+            cur.execute("SHOW SLAVE STATUS")  # MySQL < 8.0.22
+        row = cur.fetchone()
+        if row and not isinstance(row, dict):
+            row = dict(zip([d[0] for d in cur.description], row))
+    finally:
+        cur.close()
+    if not row:
+        return None
+    lag = row.get("Seconds_Behind_Source", row.get("Seconds_Behind_Master"))
+    return None if lag is None else float(lag)
+
+
+class _Replica:
+    def __init__(self, name, connect):
+        self.name = name
+        self.connect = connect
+        self.in_flight = 0
+        self.lag = None
+        self.checked_at = 0.0
+        self.healthy = True
+
+
+class _TrackedConnection:
+    """Proxy that gives the replica's in-flight slot back on close()."""
+
+    def __init__(self, conn, replica, lock):
+        self._conn = conn
+        self._replica = replica
+        self._lock = lock
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def close(self):
+        if not self._released:
+            self._released = True
+            with self._lock:
+                self._replica.in_flight -= 1
+        return self._conn.close()
+
+
+class ReplicaRouter:
+    """Routes connections between a primary and a set of read replicas.
+
+    strategy is "round_robin" or "least_loaded" (fewest open connections).
+    A replica whose lag exceeds max_lag seconds, or whose lag cannot be read,
+    is skipped until the next check. Clients that wrote within the last
+    sticky_seconds read from the primary so they see their own writes.
+    """
+
+    STRATEGIES = ("round_robin", "least_loaded")
+
+    def __init__(self, primary, replicas=(), strategy="round_robin", max_lag=5.0,
+                 lag_check_interval=2.0, sticky_seconds=5.0, lag_probe=mysql_replica_lag):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"unknown replica strategy: {strategy}")
+        self.primary = primary
+        self.replicas = [_Replica(f"replica{i}", c) for i, c in enumerate(replicas)]
+        self.strategy = strategy
+        self.max_lag = max_lag
+        self.lag_check_interval = lag_check_interval
+        self.sticky_seconds = sticky_seconds
+        self.lag_probe = lag_probe
+        self._lock = threading.Lock()
+        self._rr = itertools.count()
+        self._last_write = {}
+        self.stats = {"primary": 0, "replica": 0, "sticky": 0, "lagging": 0}
+
+    # ---------- read-your-writes ----------
+    def mark_write(self, client):
+        if client is None or not self.replicas:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._last_write[client] = now
+            if len(self._last_write) > 10000:
+                cutoff = now - self.sticky_seconds
+                self._last_write = {k: t for k, t in self._last_write.items() if t > cutoff}
+
+    def is_sticky(self, client):
+        if client is None:
+            return False
+        with self._lock:
+            wrote = self._last_write.get(client)
+        return wrote is not None and time.monotonic() - wrote < self.sticky_seconds
+
+    # ---------- selection ----------
+    def _candidates(self):
+        with self._lock:
+            if self.strategy == "least_loaded":
+                return sorted(self.replicas, key=lambda r: r.in_flight)
+            start = next(self._rr) % len(self.replicas)
+            return self.replicas[start:] + self.replicas[:start]
+
+    def _lag_ok(self, replica, conn):
+        now = time.monotonic()
+        if now - replica.checked_at >= self.lag_check_interval:
+            try:
+                replica.lag = self.lag_probe(conn) if self.lag_probe else 0.0
+            except Exception:
+                replica.lag = None
+            replica.checked_at = now
+            replica.healthy = replica.lag is not None and replica.lag <= self.max_lag
+        return replica.healthy
+
+    def _open_replica(self):
+        now = time.monotonic()
+        for replica in self._candidates():
+            # a replica known to be behind stays out until its next lag check
+            if not replica.healthy and now - replica.checked_at < self.lag_check_interval:
+                continue
+            try:
+                conn = replica.connect()
+            except Exception:
+                replica.healthy, replica.checked_at = False, now
+                continue
+            if not self._lag_ok(replica, conn):
+                self.stats["lagging"] += 1
+                conn.close()
+                continue
+            with self._lock:
+                replica.in_flight += 1
+            return _TrackedConnection(conn, replica, self._lock)
+        return None
+
+    def connect(self, readonly=False, client=None):
+        if readonly and self.replicas:
+            if self.is_sticky(client):
+                self.stats["sticky"] += 1
+            else:
+                conn = self._open_replica()
+                if conn is not None:
+                    self.stats["replica"] += 1
+                    return conn
+        self.stats["primary"] += 1
+        return self.primary()
+
+    def reader(self, client=None):
+        """A connect() for one request's reads, bound to a single server.
+
+        The replica (or the primary, for sticky clients or when no replica is
+        healthy) is picked here, on the calling thread. Every call opens
+        another connection to that same server, so queries fanned out across
+        threads can't see different replication positions. Call it at least
+        once: the connection opened to check lag is handed out first.
+        """
+        if not self.replicas or self.is_sticky(client):
+            self.stats["sticky" if self.replicas else "primary"] += 1
+            return self.primary
+        conn = self._open_replica()
+        if conn is None:
+            self.stats["primary"] += 1
+            return self.primary
+        self.stats["replica"] += 1
+        replica, opened, lock = conn._replica, [conn], threading.Lock()
+
+        def connect():
+            with lock:
+                if opened:
+                    return opened.pop()
+            raw = replica.connect()
+            with self._lock:
+                replica.in_flight += 1
+            return _TrackedConnection(raw, replica, self._lock)
+        return connect
+
+    @staticmethod
+    def is_replica(conn):
+        return isinstance(conn, _TrackedConnection)
+
+    def status(self):
+        with self._lock:
+            return [{"name": r.name, "healthy": r.healthy, "lag": r.lag, "in_flight": r.in_flight}
+                    for r in self.replicas]
+
+
+def parse_replicas(value):
+    """'host1,host2:3307' -> [("host1", 3306), ("host2", 3307)]"""
+    replicas = []
+    for item in (value or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        host, _, port = item.partition(":")
+        replicas.append((host, int(port) if port else 3306))
+    return replicas
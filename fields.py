@@ -0,0 +1,91 @@
+# ==================================================
+# SPARSE FIELDSETS
+# ?fields=a,b on list endpoints, checked against a
+# per-table whitelist and pushed into the SELECT list.
+# ==================================================
+
+# output field -> SQL expression
+MEMBER_FIELDS = {"member_id": "member_id", "name": "name"}
+CHORE_FIELDS = {"chore_id": "chore_id", "chore_name": "chore_name", "frequency": "frequency"}
+ASSIGNMENT_FIELDS = {
+    "assignment_id": "a.assignment_id",
+    "member_id": "a.member_id",
+    "chore_id": "a.chore_id",
+    "assigned_date": "a.assigned_date",
+    "is_completed": "a.is_completed",
+}
+
+# the joined /api/assignments view: field -> (SQL expression, table it needs joined)
+ASSIGNMENT_VIEW_FIELDS = {
+    "assignment_id": ("a.assignment_id", None),
+    "member_name": ("m.name", "members"),
+    "chore_name": ("c.chore_name", "chores"),
+    "frequency": ("c.frequency", "chores"),
+    "assigned_date": ("a.assigned_date", None),
+    "is_completed": ("a.is_completed", None),
+}
+# table -> (join clause, semi-join that keeps the same rows without the join)
+JOINS = {
+    "members": ("JOIN members m ON a.member_id = m.member_id",
+                "EXISTS (SELECT 1 FROM members m WHERE m.member_id = a.member_id)"),
+    "chores": ("JOIN chores c ON a.chore_id = c.chore_id",
+               "EXISTS (SELECT 1 FROM chores c WHERE c.chore_id = a.chore_id)"),
+}
+
+
+class FieldError(ValueError):
+    def __init__(self, unknown, allowed, message=None):
+        super().__init__(message or f"unknown fields: {', '.join(unknown)}")
+        self.unknown = unknown
+        self.allowed = list(allowed)
+
+
+def requested_fields(args, allowed):
+    """Fields named in ?fields=, in whitelist order; every field when absent."""
+    raw = args.get("fields", "")
+    if not raw.strip():
+        return list(allowed)
+    wanted = {f.strip() for f in raw.split(",") if f.strip()}
+    if not wanted:
+        raise FieldError([], allowed, "no fields requested")  # e.g. ?fields=,
+    unknown = sorted(wanted - set(allowed))
+    if unknown:
+        raise FieldError(unknown, allowed)
+    return [f for f in allowed if f in wanted]
+
+
+def select_list(fields, mapping):
+    """SELECT list for the chosen fields, aliased back to their output names."""
+    return ", ".join(
+        mapping[f] if mapping[f].split(".")[-1] == f else f"{mapping[f]} AS {f}"
+        for f in fields
+    )
+
+
+def assignment_view_sql(fields, source="chore_assignments"):
+    """SELECT ... FROM source a [JOIN ...] with only the joins the fields need.
+
+    A skipped join becomes an EXISTS check on its primary key, so the rows are
+    the ones the inner join would return even where no foreign key guarantees
+    a match (the partitioned table, the archive, deleted members).
+    """
+    columns = ", ".join(f"{ASSIGNMENT_VIEW_FIELDS[f][0]} AS {f}" for f in fields)
+    needed = {ASSIGNMENT_VIEW_FIELDS[f][1] for f in fields}
+    joins = "".join(f"\n        {join}" for t, (join, _) in JOINS.items() if t in needed)
+    checks = [exists for t, (_, exists) in JOINS.items() if t not in needed]
+    where = f"\n        WHERE {' AND '.join(checks)}" if checks else ""
+    return f"SELECT {columns}\n        FROM {source} a{joins}{where}"
+
+
+def with_overlay_key(fields):
+    """Fields to actually select so write-behind toggles can still be overlaid."""
+    if "is_completed" in fields and "assignment_id" not in fields:
+        return ["assignment_id"] + fields
+    return fields
+
+
+def strip(rows, fields):
+    """Drop helper columns the client didn't ask for."""
+    if rows and set(rows[0]) != set(fields):
+        return [{f: r[f] for f in fields} for r in rows]
+    return rows
@@ -1,12 +1,21 @@
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g, send_from_directory
 from flask_bcrypt import Bcrypt
-import MySQLdb
-import MySQLdb.cursors
 import jwt
 import datetime
 from functools import wraps
 import os
+import tempfile
+import uuid
+from db_router import ReplicaRouter, parse_replicas
+from storage import create_backend
+from response_cache import ResponseCache
+from archive import assignments_source, create_open_index, wants_archived
+import profiling
+import serve
+from reminders import REMINDER_CHANGES_SQL, ReminderScheduler, build_sinks, leader_lock
+from revocation import REVOKED_TOKENS_SQL, RevocationError, TokenRevocations
+from fields import FieldError, requested_fields, select_list, MEMBER_FIELDS, CHORE_FIELDS, ASSIGNMENT_FIELDS
 
 # =========================
 # App setup
@@ -16,6 +25,22 @@ bcrypt = Bcrypt(app)
 
 app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "supersecretkey123")
 app.config["JWT_EXP_HOURS"] = 2
+# comma-separated usernames; empty (the default) turns the /admin routes off
+app.config["ADMIN_USERS"] = {u.strip() for u in os.environ.get("ADMIN_USERS", "").split(",") if u.strip()}
+
+# =========================
+# Profiling (opt-in: X-Profile/_profile=<PROFILE_TOKEN> or random sampling)
+# =========================
+app.config["PROFILE_DIR"] = os.environ.get("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "house_chores_profiles"))
+profiler = profiling.install(
+    app,
+    app.config["PROFILE_DIR"],
+    token=os.environ.get("PROFILE_TOKEN"),
+    sample_rate=float(os.environ.get("PROFILE_SAMPLE_RATE", "0")),
+    mode=os.environ.get("PROFILE_MODE", "sample"),
+    max_files=int(os.environ.get("PROFILE_MAX_FILES", "200")),
+    max_age=float(os.environ.get("PROFILE_MAX_AGE_HOURS", "168")) * 3600
+)
 
 # =========================
 # Database config
@@ -24,24 +49,107 @@ DB_HOST = "localhost"
 DB_USER = "root"
 DB_PASS = "root"
 DB_NAME = "house_chores"
+# DB_BACKEND=mysql (default) or sqlite, stored in SQLITE_PATH
+DB_BACKEND = os.environ.get("DB_BACKEND", "mysql")
+SQLITE_PATH = os.environ.get("SQLITE_PATH", "house_chores.db")
+# read replicas, e.g. DB_REPLICAS="replica1,replica2:3307"
+DB_REPLICAS = parse_replicas(os.environ.get("DB_REPLICAS", ""))
+
+storage = create_backend(
+    DB_BACKEND,
+    {"host": DB_HOST, "user": DB_USER, "password": DB_PASS, "database": DB_NAME},
+    sqlite_path=SQLITE_PATH,
+    pool_size=int(os.environ.get("DB_POOL_SIZE", "10"))
+)
+replica_backends = [storage.replica(host, port) for host, port in DB_REPLICAS]
+
+db_router = ReplicaRouter(
+    storage.connect,
+    [replica.connect for replica in replica_backends],
+    strategy=os.environ.get("DB_REPLICA_STRATEGY", "round_robin"),
+    max_lag=float(os.environ.get("DB_REPLICA_MAX_LAG", "5")),
+    sticky_seconds=float(os.environ.get("DB_STICKY_SECONDS", "5"))
+)
+
+def client_key():
+    return request.headers.get("Authorization") or request.remote_addr
+
+def get_db_connection(readonly=False):
+    # readonly connections may come from a replica; writes always use the primary
+    conn = db_router.connect(readonly, client_key() if readonly else None)
+    if readonly and db_router.is_replica(conn):
+        g.replica_read = True
+    return conn
+
+def get_cursor(readonly=False):
+    conn = get_db_connection(readonly)
+    return conn, conn.cursor()
 
-def get_db_connection():
-    return MySQLdb.connect(
-        host=DB_HOST,
-        user=DB_USER,
-        password=DB_PASS,
-        db=DB_NAME,
-        cursorclass=MySQLdb.cursors.DictCursor
-    )
+@app.after_request
+def remember_writes(response):
+    # keep a client on the primary for a while after it changed something
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        db_router.mark_write(client_key())
+    return response
 
-def get_cursor():
-    conn = get_db_connection()
-    return conn, conn.cursor()
+# =========================
+# Response cache (shared with app.py and every worker on the host)
+# =========================
+response_cache = ResponseCache(
+    os.environ.get("RESPONSE_CACHE_PATH", os.path.join(tempfile.gettempdir(), "house_chores_cache.db")),
+    namespace="login",
+    max_bytes=int(os.environ.get("RESPONSE_CACHE_BYTES", str(64 * 1024 * 1024))),
+    ttl=float(os.environ.get("RESPONSE_CACHE_TTL", "60")),
+    enabled=os.environ.get("RESPONSE_CACHE", "1") == "1",
+    replica_lag=db_router.max_lag + db_router.lag_check_interval
+)
+# clients pinned to the primary after a write skip the shared cache
+response_cache.bypass = lambda tables: db_router.is_sticky(client_key())
+response_cache.used_replica = lambda: g.get("replica_read", False)
+
+# =========================
+# Reminders (the same lock as app.py, so only one process fires them)
+# =========================
+reminders = ReminderScheduler(
+    get_db_connection,
+    build_sinks(os.environ.get("REMINDER_SINKS", "log"), os.environ.get("REMINDER_WEBHOOK_URL"), app.logger),
+    hour=int(os.environ.get("REMINDER_HOUR", "8")),
+    repeat=float(os.environ.get("REMINDER_REPEAT_HOURS", "24")) * 3600,
+    overdue_days=int(os.environ.get("REMINDER_OVERDUE_DAYS", "1")),
+    poll_interval=float(os.environ.get("REMINDER_POLL_SECONDS", "1")),
+    enabled=os.environ.get("REMINDERS", "1") == "1"
+)
+
+def start_reminders():
+    if os.environ.get("REMINDERS", "1") == "1":
+        try:
+            lock_path = os.environ.get("REMINDER_LOCK", os.path.join(tempfile.gettempdir(), "house_chores_reminders.lock"))
+            reminders.start(leader_lock(storage, lock_path))
+        except Exception as e:
+            app.logger.warning("reminder scheduler not started: %s", e)
+
+# =========================
+# Token revocation (revoked_tokens is shared with app.py)
+# =========================
+revocations = TokenRevocations(get_db_connection, poll_interval=float(os.environ.get("REVOCATION_POLL_SECONDS", "2")))
+
+def revoke_claims(claims):
+    # kept only until the token would have expired anyway
+    if not claims.get("jti"):
+        return False
+    return revocations.revoke(claims["jti"], datetime.datetime.utcfromtimestamp(claims["exp"]))
 
 # SAFE request data reader (JSON or form)
 def get_request_data():
     return request.get_json(silent=True) or request.form or {}
 
+# ?fields=a,b -> SELECT list, or FieldError for columns outside the whitelist
+def get_columns(allowed):
+    return select_list(requested_fields(request.args, allowed), allowed)
+
+def fields_error(e):
+    return jsonify({"error": str(e), "allowed": e.allowed}), 400
+
 # =========================
 # JWT decorator
 # =========================
@@ -53,11 +161,22 @@ def token_required(f):
             return jsonify({"error": "token missing"}), 401
         try:
             token = auth.replace("Bearer ", "")
-            jwt.decode(token, app.config["SECRET_KEY"], algorithms=["HS256"])
+            g.token_claims = jwt.decode(token, app.config["SECRET_KEY"], algorithms=["HS256"])
         except jwt.ExpiredSignatureError:
             return jsonify({"error": "token expired"}), 401
         except jwt.InvalidTokenError:
             return jsonify({"error": "invalid token"}), 401
+        if revocations.is_revoked(g.token_claims.get("jti")):
+            return jsonify({"error": "token revoked"}), 401
+        return f(*args, **kwargs)
+    return decorated
+
+def admin_required(f):
+    @wraps(f)
+    @token_required
+    def decorated(*args, **kwargs):
+        if g.token_claims.get("user") not in app.config["ADMIN_USERS"]:
+            return jsonify({"error": "admin only"}), 403
         return f(*args, **kwargs)
     return decorated
 
@@ -135,6 +254,7 @@ def login():
     token = jwt.encode(
         {
             "user": username,
+            "jti": uuid.uuid4().hex,
             "exp": datetime.datetime.utcnow() + datetime.timedelta(hours=2)
         },
         app.config["SECRET_KEY"],
@@ -146,16 +266,30 @@ def login():
 
     return jsonify({"token": token})
 
+@app.route("/auth/logout", methods=["POST"])
+@token_required
+def logout():
+    try:
+        revoke_claims(g.token_claims)
+    except RevocationError:
+        return jsonify({"error": "logout not recorded: the token stays valid until it expires"}), 503
+    return jsonify({"message": "logged out"})
+
 # =========================
 # MEMBERS
 # =========================
 @app.route("/members", methods=["GET", "POST"])
 @token_required
+@response_cache.cached("members")
 def members():
     if request.method == "GET":
-        conn, cur = get_cursor()
         try:
-            cur.execute("SELECT * FROM members")
+            columns = get_columns(MEMBER_FIELDS)
+        except FieldError as e:
+            return fields_error(e)
+        conn, cur = get_cursor(readonly=True)
+        try:
+            cur.execute(f"SELECT {columns} FROM members")
             return jsonify(cur.fetchall())
         finally:
             cur.close()
@@ -170,6 +304,7 @@ def members():
     try:
         cur.execute("INSERT INTO members (name) VALUES (%s)", (name,))
         conn.commit()
+        response_cache.bump("members")
         return jsonify({"member_id": cur.lastrowid, "name": name}), 201
     finally:
         cur.close()
@@ -180,11 +315,16 @@ def members():
 # =========================
 @app.route("/chores", methods=["GET", "POST"])
 @token_required
+@response_cache.cached("chores")
 def chores():
     if request.method == "GET":
-        conn, cur = get_cursor()
         try:
-            cur.execute("SELECT * FROM chores")
+            columns = get_columns(CHORE_FIELDS)
+        except FieldError as e:
+            return fields_error(e)
+        conn, cur = get_cursor(readonly=True)
+        try:
+            cur.execute(f"SELECT {columns} FROM chores")
             return jsonify(cur.fetchall())
         finally:
             cur.close()
@@ -204,6 +344,7 @@ def chores():
             (chore, freq)
         )
         conn.commit()
+        response_cache.bump("chores")
         return jsonify({"chore_id": cur.lastrowid}), 201
     finally:
         cur.close()
@@ -214,14 +355,20 @@ def chores():
 # =========================
 @app.route("/assignments", methods=["GET", "POST"])
 @token_required
+@response_cache.cached("chore_assignments")
 def assignments():
     if request.method == "GET":
-        conn, cur = get_cursor()
         try:
-            cur.execute("SELECT * FROM chore_assignments")
+            columns = get_columns(ASSIGNMENT_FIELDS)
+        except FieldError as e:
+            return fields_error(e)
+        conn, cur = get_cursor(readonly=True)
+        try:
+            # only the hot table unless ?include_archived=1
+            cur.execute(f"SELECT {columns} FROM {assignments_source(wants_archived(request.args))} a")
             rows = cur.fetchall()
             for r in rows:
-                if isinstance(r["assigned_date"], (datetime.date, datetime.datetime)):
+                if isinstance(r.get("assigned_date"), (datetime.date, datetime.datetime)):
                     r["assigned_date"] = r["assigned_date"].isoformat()
             return jsonify(rows)
         finally:
@@ -244,8 +391,11 @@ def assignments():
                VALUES (%s,%s,%s,0)""",
             (member_id, chore_id, assigned_date)
         )
+        assignment_id = cur.lastrowid
+        reminders.publish([assignment_id], cur)
         conn.commit()
-        return jsonify({"assignment_id": cur.lastrowid}), 201
+        response_cache.bump("chore_assignments")
+        return jsonify({"assignment_id": assignment_id}), 201
     finally:
         cur.close()
         conn.close()
@@ -255,16 +405,72 @@ def assignments():
 # =========================
 @app.route("/api/search", methods=["GET"])
 @token_required
+@response_cache.cached("chores")
 def search():
     q = request.args.get("q", "")
-    conn, cur = get_cursor()
     try:
-        cur.execute("SELECT * FROM chores WHERE chore_name LIKE %s", (f"%{q}%",))
+        columns = get_columns(CHORE_FIELDS)
+    except FieldError as e:
+        return fields_error(e)
+    conn, cur = get_cursor(readonly=True)
+    try:
+        cur.execute(f"SELECT {columns} FROM chores WHERE chore_name LIKE %s", (f"%{q}%",))
         return jsonify(cur.fetchall())
     finally:
         cur.close()
         conn.close()
 
+# =========================
+# ADMIN: PROFILES
+# =========================
+@app.route("/admin/profiles", methods=["GET"])
+@admin_required
+def list_profiles():
+    return jsonify(profiler.list_profiles())
+
+@app.route("/admin/profiles/<path:name>", methods=["GET"])
+@admin_required
+def get_profile(name):
+    return send_from_directory(app.config["PROFILE_DIR"], name, mimetype="text/plain")
+
+# =========================
+# ADMIN: TOKEN REVOCATION
+# =========================
+@app.route("/admin/tokens/revoke", methods=["POST"])
+@admin_required
+def revoke_token():
+    # {"token": "<jwt>"}, or {"jti": "..."} held for the longest token lifetime
+    data = get_request_data()
+    if data.get("token"):
+        try:
+            claims = jwt.decode(data["token"], app.config["SECRET_KEY"], algorithms=["HS256"],
+                                options={"verify_exp": False})
+        except jwt.InvalidTokenError:
+            return jsonify({"error": "invalid token"}), 400
+    elif data.get("jti"):
+        claims = {"jti": data["jti"],
+                  "exp": (datetime.datetime.now(datetime.timezone.utc)
+                          + datetime.timedelta(hours=app.config["JWT_EXP_HOURS"])).timestamp()}
+    else:
+        return jsonify({"error": "token or jti required"}), 400
+    if not claims.get("jti"):
+        return jsonify({"error": "token has no jti and can't be revoked"}), 400
+    try:
+        revoked = revoke_claims(claims)
+    except RevocationError:
+        return jsonify({"error": "revocation not recorded"}), 503
+    return jsonify({"jti": claims["jti"], "revoked": revoked})
+
+@app.route("/admin/tokens/revocations", methods=["GET"])
+@admin_required
+def revocation_status():
+    return jsonify(revocations.status())
+
+@app.route("/admin/reminders/metrics", methods=["GET"])
+@admin_required
+def reminder_metrics():
+    return jsonify(reminders.metrics())
+
 # =========================
 # HEALTH CHECK
 # =========================
@@ -272,8 +478,41 @@ def search():
 def index():
     return jsonify({"status": "API running"})
 
+# =========================
+# PRODUCTION SERVER (flask --app login serve)
+# =========================
+def init_db():
+    # the tables and index this app's features add to the shared schema (schema.sql has the rest)
+    conn, cur = get_cursor()
+    try:
+        cur.execute(REVOKED_TOKENS_SQL)
+        cur.execute(REMINDER_CHANGES_SQL)
+        create_open_index(cur)
+        conn.commit()
+    finally:
+        cur.close()
+        conn.close()
+
+def worker_started():
+    # drop connections inherited from the master, then open a few per worker up front
+    response_cache.after_fork()
+    revocations.after_fork()
+    for backend in [storage] + replica_backends:
+        backend.after_fork()
+        if backend.pool is not None:
+            try:
+                backend.pool.warm_up(int(os.environ.get("DB_POOL_WARM", "2")))
+            except Exception as e:
+                app.logger.warning("connection pool warm-up failed: %s", e)
+    start_reminders()
+
+app.cli.add_command(serve.command(app, on_start=init_db, on_fork=worker_started, on_exit=reminders.stop))
+
 # =========================
 # RUN
 # =========================
 if __name__ == "__main__":
+    init_db()
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_reminders()
     app.run(debug=True)
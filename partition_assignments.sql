@@ -0,0 +1,29 @@
+-- Monthly RANGE partitioning of chore_assignments on assigned_date (MySQL 8).
+-- Run once on an existing database, e.g. mysql house_chores < partition_assignments.sql
+--
+-- MySQL requires the partitioning column in every unique key and does not allow
+-- foreign keys on partitioned tables, so the primary key becomes
+-- (assignment_id, assigned_date) and the two foreign keys are dropped; the
+-- application already only inserts member/chore ids it has looked up.
+-- New months are split off pmax by `flask --app app archive-assignments`
+-- (see archive.ensure_partitions), old completed rows move to
+-- chore_assignments_archive.
+
+ALTER TABLE chore_assignments DROP FOREIGN KEY chore_assignments_ibfk_1;
+ALTER TABLE chore_assignments DROP FOREIGN KEY chore_assignments_ibfk_2;
+
+UPDATE chore_assignments SET assigned_date = '1970-01-01' WHERE assigned_date IS NULL;
+ALTER TABLE chore_assignments
+  MODIFY assigned_date DATE NOT NULL,
+  DROP PRIMARY KEY,
+  ADD PRIMARY KEY (assignment_id, assigned_date);
+
+-- everything before the current month lands in p_old; the archive job adds months.
+-- Partition bounds must be constants: set the date below to the first day of the
+-- month you run this in, or print this statement with
+--   flask --app app partition-sql
+ALTER TABLE chore_assignments
+  PARTITION BY RANGE (TO_DAYS(assigned_date)) (
+    PARTITION p_old VALUES LESS THAN (TO_DAYS('2026-10-01')),
+    PARTITION pmax VALUES LESS THAN MAXVALUE
+  );
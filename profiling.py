@@ -0,0 +1,165 @@
+# ==================================================
+# ON-DEMAND REQUEST PROFILING
+# Wraps the WSGI app so a profiled request covers the
+# auth decorator, the view, SQL and serialization.
+# Output is collapsed-stack text (flamegraph.pl,
+# speedscope, inferno) or a cProfile .prof file.
+# ==================================================
+
+import cProfile
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from urllib.parse import parse_qs
+
+
+class SamplingProfiler:
+    """Samples one thread's Python stack every `interval` seconds."""
+
+    def __init__(self, thread_id, interval=0.001):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-sampler", daemon=True)
+
+    @staticmethod
+    def _label(code):
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfilingMiddleware:
+    """Profiles a request when it carries the profile token or is randomly sampled.
+
+    Trigger with the `X-Profile: <token>` header or `?_profile=<token>`;
+    sample_rate (0..1) profiles that share of all other requests. Each save
+    keeps the newest max_files profiles and drops any older than max_age
+    seconds.
+    """
+
+    def __init__(self, wsgi_app, directory, token=None, sample_rate=0.0, mode="sample",
+                 interval=0.001, max_files=200, max_age=7 * 24 * 3600):
+        self.wsgi_app = wsgi_app
+        self.directory = directory
+        self.token = token
+        self.sample_rate = sample_rate
+        # cProfile is the fallback where stacks of other threads can't be sampled
+        self.mode = mode if hasattr(sys, "_current_frames") else "cprofile"
+        self.interval = interval
+        self.max_files = max_files
+        self.max_age = max_age
+        os.makedirs(directory, exist_ok=True)
+
+    def wanted(self, environ):
+        if self.token:
+            if environ.get("HTTP_X_PROFILE") == self.token:
+                return True
+            if self.token in parse_qs(environ.get("QUERY_STRING", "")).get("_profile", []):
+                return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def __call__(self, environ, start_response):
+        if not self.wanted(environ):
+            return self.wsgi_app(environ, start_response)
+
+        if self.mode == "cprofile":
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # another profiler is already active in this process
+                return self.wsgi_app(environ, start_response)
+        else:
+            profiler = SamplingProfiler(threading.get_ident(), self.interval)
+            profiler.start()
+        started = time.perf_counter()
+        try:
+            # drain the iterable here so lazy serialization is inside the profile
+            result = self.wsgi_app(environ, start_response)
+            try:
+                body = list(result)
+            finally:
+                if hasattr(result, "close"):
+                    result.close()
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if self.mode == "cprofile":
+                profiler.disable()
+            else:
+                profiler.stop()
+            self.save(profiler, environ, elapsed_ms)
+        return body
+
+    def save(self, profiler, environ, elapsed_ms):
+        path = re.sub(r"[^A-Za-z0-9]+", "_", environ.get("PATH_INFO", "")).strip("_") or "root"
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        name = (f"{stamp}-{uuid.uuid4().hex[:6]}-{environ.get('REQUEST_METHOD', 'GET')}"
+                f"-{path}-{elapsed_ms:.0f}ms")
+        if self.mode == "cprofile":
+            profiler.dump_stats(os.path.join(self.directory, name + ".prof"))
+        else:
+            with open(os.path.join(self.directory, name + ".collapsed"), "w") as f:
+                f.write(profiler.collapsed())
+        self.prune()
+
+    def _profile_names(self):
+        # names start with a %Y%m%d-%H%M%S stamp, so name order is age order
+        return sorted(n for n in os.listdir(self.directory) if n.endswith((".collapsed", ".prof")))
+
+    def prune(self):
+        """Delete profiles beyond max_files or older than max_age. Returns how many went."""
+        names = self._profile_names()
+        oldest = time.strftime("%Y%m%d-%H%M%S", time.localtime(time.time() - self.max_age))
+        doomed = [n for n in names if n[:15] < oldest]
+        doomed += names[len(doomed):max(len(doomed), len(names) - self.max_files)]
+        for name in doomed:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass  # another worker pruned it first
+        return len(doomed)
+
+    def list_profiles(self):
+        profiles = []
+        for name in reversed(self._profile_names()):
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            profiles.append({"name": name, "bytes": stat.st_size,
+                             "created": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(stat.st_mtime))})
+        return profiles
+
+
+def install(app, directory, token=None, sample_rate=0.0, mode="sample", interval=0.001,
+            max_files=200, max_age=7 * 24 * 3600):
+    """Wrap app.wsgi_app and return the middleware (for listing profiles)."""
+    middleware = ProfilingMiddleware(app.wsgi_app, directory, token, sample_rate, mode, interval,
+                                     max_files, max_age)
+    app.wsgi_app = middleware
+    return middleware
@@ -0,0 +1,50 @@
+# ==================================================
+# QUERY FAN-OUT
+# Runs a request's independent read queries side by
+# side on separate pooled connections.
+# ==================================================
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("QUERY_FANOUT_THREADS", "8")),
+    thread_name_prefix="query-fanout"
+)
+
+
+def _run(connect, sql, params):
+    db = connect(); cur = db.cursor()
+    try:
+        cur.execute(sql, params)
+        return cur.fetchall()
+    finally:
+        db.close()
+
+
+def run_sequentially(connect, queries):
+    """Same result as run_concurrently, on one connection; for local databases."""
+    db = connect(); cur = db.cursor()
+    try:
+        results = []
+        for sql, params in queries:
+            cur.execute(sql, params)
+            results.append(cur.fetchall())
+        return results
+    finally:
+        db.close()
+
+
+def run_concurrently(connect, queries):
+    """Run (sql, params) pairs at the same time and return their rows in order.
+
+    `connect` must be safe to call from worker threads, so resolve anything that
+    depends on the request (replica choice, stickiness) before calling this.
+    The first query runs on the calling thread; the rest overlap with it.
+    """
+    queries = list(queries)
+    if not queries:
+        return []
+    futures = [_executor.submit(_run, connect, sql, params) for sql, params in queries[1:]]
+    first = _run(connect, *queries[0])
+    return [first] + [f.result() for f in futures]
@@ -0,0 +1,524 @@
+# ==================================================
+# CHORE REMINDERS
+# Open assignments sit in an in-memory min-heap keyed
+# by due time. It is loaded once from the
+# (is_completed, assigned_date) index and then kept
+# current through reminder_changes, a change log the
+# assignment write routes append to, so nothing scans
+# chore_assignments on a timer.
+# ==================================================
+
+import datetime
+import heapq
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+import urllib.request
+
+REMINDER_CHANGES_SQL = """
+CREATE TABLE IF NOT EXISTS reminder_changes (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    assignment_id INT
+)"""
+
+
+# ==================================================
+# SINKS
+# A sink is any callable taking a list of reminder events.
+# ==================================================
+class LogSink:
+    def __init__(self, logger=None):
+        self.logger = logger or logging.getLogger("reminders")
+
+    def __call__(self, events):
+        for e in events:
+            self.logger.info("reminder: assignment %s (member %s, chore %s) %s since %s",
+                             e["assignment_id"], e["member_id"], e["chore_id"],
+                             "overdue" if e["overdue"] else "due", e["assigned_date"])
+
+
+class WebhookSink:
+    """POSTs each batch as {"reminders": [...]} to url."""
+
+    def __init__(self, url, timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def __call__(self, events):
+        body = json.dumps({"reminders": events}).encode()
+        req = urllib.request.Request(self.url, data=body, method="POST",
+                                     headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(req, timeout=self.timeout) as response:
+            response.read()
+
+
+def build_sinks(names, webhook_url=None, logger=None):
+    """Sinks from a "log,webhook" style setting."""
+    sinks = []
+    for name in filter(None, (n.strip() for n in names.split(","))):
+        if name == "log":
+            sinks.append(LogSink(logger))
+        elif name == "webhook":
+            if not webhook_url:
+                raise ValueError("webhook reminder sink needs REMINDER_WEBHOOK_URL")
+            sinks.append(WebhookSink(webhook_url))
+        else:
+            raise ValueError(f"unknown reminder sink: {name}")
+    return sinks
+
+
+# ==================================================
+# LEADERSHIP
+# Only the lock holder keeps the queue and fires.
+# A lock has acquire() -> bool, held() and release().
+# ==================================================
+class FileLock:
+    """An fcntl lock on a local file: one leader per host (the SQLite backend is one host)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def acquire(self):
+        import fcntl
+        lock_file = open(self.path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._file = lock_file
+        return True
+
+    def held(self):
+        return self._file is not None
+
+    def release(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class DatabaseLock:
+    """A MySQL named lock (GET_LOCK): one leader for every host on the database.
+
+    The lock lives as long as the connection that took it, so it is held on
+    a connection of its own, opened by `connect`. If that connection drops,
+    held() turns False and the server frees the lock for someone else.
+    """
+
+    def __init__(self, connect, name="house_chores_reminders"):
+        self.connect = connect
+        self.name = name
+        self._conn = None
+
+    def _query(self, sql):
+        cur = self._conn.cursor()
+        try:
+            cur.execute(sql, (self.name,))
+            row = cur.fetchone()
+        finally:
+            cur.close()
+        return list(row.values())[0] if isinstance(row, dict) else row[0]
+
+    def acquire(self):
+        self._conn = self.connect()
+        try:
+            if self._query("SELECT GET_LOCK(%s, 0)") == 1:
+                return True
+        except Exception:
+            pass
+        self._close()
+        return False
+
+    def held(self):
+        if self._conn is None:
+            return False
+        try:
+            if self._query("SELECT IS_USED_LOCK(%s) = CONNECTION_ID()") == 1:
+                return True
+        except Exception:
+            pass
+        self._close()
+        return False
+
+    def release(self):
+        if self._conn is not None:
+            try:
+                self._query("SELECT RELEASE_LOCK(%s)")
+            except Exception:
+                pass
+            self._close()
+
+    def _close(self):
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+        self._conn = None
+
+
+def leader_lock(storage, lock_path):
+    """The database's named lock on MySQL (shared by every host), the file lock on SQLite."""
+    if storage.name == "mysql":
+        return DatabaseLock(storage.connect_unpooled)
+    return FileLock(lock_path)
+
+
+# ==================================================
+# SCHEDULER
+# ==================================================
+class ReminderScheduler:
+    """Fires a reminder when an open assignment falls due, then every `repeat` seconds.
+
+    An assignment is due at `hour`:00 local time on its assigned_date and is
+    reminded about until overdue_days days after that date; older open
+    assignments are left alone.
+    Due reminders are handed to the sinks in batches of up to batch_size;
+    a failing sink is counted and logged but doesn't stop the others.
+    Cancelled or rescheduled entries stay in the heap and are skipped
+    when they surface, so every update is O(log n).
+
+    Every process publishes the ids it writes to reminder_changes; only the
+    leader (the holder of the lock passed to start()) keeps the queue. It polls the log
+    by id every poll_interval and re-reads just those assignments by
+    primary key.
+    """
+
+    COLUMNS = "assignment_id, member_id, chore_id, assigned_date, is_completed"
+    POLL_OVERLAP = 50  # re-read ids that may have committed out of order
+
+    def __init__(self, connect, sinks=(), hour=8, repeat=24 * 3600, overdue_days=1, batch_size=100,
+                 poll_interval=1.0, lock_retry=5.0, overlay=None, enabled=True,
+                 clock=time.time, logger=None):
+        self.connect = connect
+        self.sinks = list(sinks)
+        self.hour = hour
+        self.repeat = repeat
+        self.overdue_days = overdue_days
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lock_retry = lock_retry
+        # applies not-yet-written completion toggles to rows read back from the db
+        self.overlay = overlay
+        self.enabled = enabled
+        self.clock = clock
+        self.logger = logger or logging.getLogger("reminders")
+        self._heap = []
+        self._entries = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+        self._leader_lock = None
+        self._last_change = 0
+        self.leader = False
+        self.stats = {"loads": 0, "changes": 0, "fired": 0, "batches": 0, "sink_errors": 0,
+                      "publish_errors": 0, "last_lag": 0.0, "max_lag": 0.0, "last_fired_at": None}
+
+    # ---------- due times ----------
+    @staticmethod
+    def _date(value):
+        if isinstance(value, str):
+            return datetime.date.fromisoformat(value[:10])
+        if isinstance(value, datetime.datetime):
+            return value.date()
+        return value
+
+    def due_at(self, assigned_date):
+        return datetime.datetime.combine(self._date(assigned_date), datetime.time(self.hour)).timestamp()
+
+    def expires_at(self, assigned_date):
+        """Midnight ending the last day an assignment is still reminded about."""
+        last = self._date(assigned_date) + datetime.timedelta(days=self.overdue_days + 1)
+        return datetime.datetime.combine(last, datetime.time()).timestamp()
+
+    def oldest_date(self):
+        """Earliest assigned_date still inside the reminder window."""
+        return datetime.date.fromtimestamp(self.clock()) - datetime.timedelta(days=self.overdue_days)
+
+    # ---------- queue updates (call with self._cond held) ----------
+    def _push(self, info, due):
+        entry = [due, next(self._seq), info]
+        self._entries[info["assignment_id"]] = entry
+        heapq.heappush(self._heap, entry)
+        return entry
+
+    def _cancel(self, assignment_id):
+        entry = self._entries.pop(assignment_id, None)
+        if entry is not None:
+            entry[2] = None  # skipped when it reaches the top
+        if len(self._heap) > 2 * len(self._entries) + 1024:
+            self._heap = [e for e in self._heap if e[2] is not None]
+            heapq.heapify(self._heap)
+
+    def _apply(self, row):
+        assignment_id = row["assignment_id"]
+        if row.get("is_completed") or self._date(row["assigned_date"]) < self.oldest_date():
+            self._cancel(assignment_id)
+            return
+        info = {"assignment_id": assignment_id, "member_id": row.get("member_id"),
+                "chore_id": row.get("chore_id"), "assigned_date": row["assigned_date"]}
+        current = self._entries.get(assignment_id)
+        if current is not None and current[2]["assigned_date"] == info["assigned_date"]:
+            current[2].update(info)  # same due date: keep its place (and repeat state)
+            return
+        self._cancel(assignment_id)
+        info["queued_at"] = self.clock()
+        self._push(info, self.due_at(info["assigned_date"]))
+
+    # ---------- write side (every process) ----------
+    def publish(self, assignment_ids, cur=None):
+        """Log changed assignments for the leader.
+
+        Pass the writer's cursor to log inside its transaction, so the entry
+        commits (or rolls back) with the change itself.
+        """
+        rows = [(int(a),) for a in assignment_ids]
+        if not self.enabled or not rows:
+            return
+        sql = "INSERT INTO reminder_changes (assignment_id) VALUES (%s)"
+        try:
+            if cur is not None:
+                cur.executemany(sql, rows)
+                return
+            db = self.connect(); own = db.cursor()
+            try:
+                own.executemany(sql, rows)
+                db.commit()
+            finally:
+                db.close()
+        except Exception as e:
+            self.stats["publish_errors"] += 1
+            self.logger.warning("reminder change not logged: %s", e)
+
+    def publish_range(self, cur, start, end):
+        """Log every open assignment dated start..end (an index range read), e.g. after a bulk insert."""
+        if not self.enabled:
+            return
+        try:
+            cur.execute(
+                "INSERT INTO reminder_changes (assignment_id) SELECT assignment_id FROM chore_assignments "
+                "WHERE is_completed = 0 AND assigned_date BETWEEN %s AND %s", (start, end))
+        except Exception as e:
+            self.stats["publish_errors"] += 1
+            self.logger.warning("reminder change not logged: %s", e)
+
+    # ---------- leader side ----------
+    def load(self):
+        """Read the open assignments in the reminder window into the queue (once, on becoming leader).
+
+        The change log position is taken first, so writes that land during
+        the load are replayed by the next poll.
+        """
+        db = self.connect(); cur = db.cursor()
+        try:
+            cur.execute("SELECT MAX(id) AS id FROM reminder_changes")
+            row = cur.fetchone()
+            last_change = (row and row["id"]) or 0
+            cur.execute(f"SELECT {self.COLUMNS} FROM chore_assignments "
+                        "WHERE is_completed = 0 AND assigned_date >= %s", (self.oldest_date(),))
+            rows = cur.fetchall()
+        finally:
+            db.close()
+        if self.overlay:
+            rows = self.overlay(rows)
+        with self._cond:
+            seen = {r["assignment_id"] for r in rows}
+            for assignment_id in [a for a in self._entries if a not in seen]:
+                self._cancel(assignment_id)
+            for r in rows:
+                self._apply(r)
+            self._last_change = last_change
+            self.stats["loads"] += 1
+            self._cond.notify()
+        return len(rows)
+
+    def poll_changes(self):
+        """Apply logged changes since the last poll. Returns how many ids were re-read."""
+        db = self.connect(); cur = db.cursor()
+        try:
+            cur.execute("SELECT id, assignment_id FROM reminder_changes WHERE id > %s ORDER BY id",
+                        (max(0, self._last_change - self.POLL_OVERLAP),))
+            changes = cur.fetchall()
+            if not changes:
+                return 0
+            ids = sorted({c["assignment_id"] for c in changes})
+            rows = []
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                cur.execute(f"SELECT {self.COLUMNS} FROM chore_assignments "
+                            f"WHERE assignment_id IN ({','.join(['%s'] * len(chunk))})", chunk)
+                rows.extend(cur.fetchall())
+            last_change = max(self._last_change, max(c["id"] for c in changes))
+            # entries behind the overlap window have been applied for good
+            cur.execute("DELETE FROM reminder_changes WHERE id <= %s",
+                        (last_change - self.POLL_OVERLAP,))
+            db.commit()
+        finally:
+            db.close()
+        if self.overlay:
+            rows = self.overlay(rows)
+        with self._cond:
+            found = {r["assignment_id"] for r in rows}
+            for r in rows:
+                self._apply(r)
+            for assignment_id in ids:
+                if assignment_id not in found:
+                    self._cancel(assignment_id)  # deleted
+            self._last_change = last_change
+            self.stats["changes"] += len(ids)
+            self._cond.notify()
+        return len(ids)
+
+    # ---------- firing ----------
+    def _take_due(self, now):
+        batch = []
+        while self._heap and len(batch) < self.batch_size:
+            due, _, info = self._heap[0]
+            if info is None:
+                heapq.heappop(self._heap)
+                continue
+            if due > now:
+                break
+            heapq.heappop(self._heap)
+            del self._entries[info["assignment_id"]]
+            expires = self.expires_at(info["assigned_date"])
+            if now >= expires:
+                continue  # its window closed before it could fire (e.g. no leader meanwhile)
+            batch.append((due, info))
+            if self.repeat and max(due, now) + self.repeat < expires:
+                # still open: remind again later, counting from now rather than the old due time
+                self._push(info, max(due, now) + self.repeat)
+        return batch
+
+    def run_due(self, now=None):
+        """Fire every reminder due by `now`, batch by batch. Returns how many fired."""
+        now = self.clock() if now is None else now
+        today = datetime.date.fromtimestamp(now)
+        fired = 0
+        while True:
+            with self._cond:
+                batch = self._take_due(now)
+            if not batch:
+                return fired
+            events = [{
+                "assignment_id": info["assignment_id"],
+                "member_id": info["member_id"],
+                "chore_id": info["chore_id"],
+                "assigned_date": str(info["assigned_date"]),
+                "due_at": datetime.datetime.fromtimestamp(due).isoformat(timespec="seconds"),
+                "overdue": self._date(info["assigned_date"]) < today
+            } for due, info in batch]
+            for sink in self.sinks:
+                try:
+                    sink(events)
+                except Exception as e:
+                    self.stats["sink_errors"] += 1
+                    self.logger.warning("reminder sink %r failed: %s", sink, e)
+            # lag: how long the oldest reminder in the batch could have fired before it did
+            lag = max(0.0, self.clock() - min(max(due, info["queued_at"]) for due, info in batch))
+            self.stats["fired"] += len(batch)
+            self.stats["batches"] += 1
+            self.stats["last_lag"] = lag
+            self.stats["max_lag"] = max(self.stats["max_lag"], lag)
+            self.stats["last_fired_at"] = self.clock()
+            fired += len(batch)
+
+    def next_due(self):
+        with self._cond:
+            while self._heap and self._heap[0][2] is None:
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
+
+    def _acquire_leadership(self):
+        if self._leader_lock is not None and not self._leader_lock.acquire():
+            return False
+        self.load()
+        self.leader = True
+        return True
+
+    def _step_down(self):
+        self.leader = False
+        with self._cond:
+            self._heap, self._entries = [], {}
+
+    def _run(self):
+        while not self._stopped:
+            if self.leader and self._leader_lock is not None and not self._leader_lock.held():
+                self.logger.warning("reminder scheduler lost its lock; stepping down")
+                self._step_down()
+            if not self.leader:
+                try:
+                    acquired = self._acquire_leadership()
+                except Exception as e:
+                    acquired = False
+                    self.logger.warning("reminder scheduler: %s", e)
+                    if self._leader_lock is not None:
+                        self._leader_lock.release()
+                if not acquired:
+                    # e.g. the old leader is still draining after a graceful reload
+                    with self._cond:
+                        self._cond.wait(self.lock_retry)
+                    continue
+            try:
+                self.poll_changes()
+                self.run_due()
+            except Exception as e:
+                self.logger.warning("reminder scheduler: %s", e)
+            with self._cond:
+                if self._stopped:
+                    return
+                wait = self.poll_interval
+                next_due = self._heap[0][0] if self._heap else None
+                if next_due is not None:
+                    wait = min(wait, next_due - self.clock())
+                self._cond.wait(max(0.05, wait))
+
+    # ---------- lifecycle ----------
+    def start(self, lock=None):
+        """Start the scheduler thread.
+
+        With a lock (FileLock for one host, DatabaseLock for all hosts on a
+        MySQL server), only its holder keeps the queue and fires reminders.
+        The others keep retrying every lock_retry seconds and take over when
+        the leader exits or loses the lock.
+        """
+        if not self.enabled or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._leader_lock = lock
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="reminder-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self.leader = False
+        if self._leader_lock is not None:
+            self._leader_lock.release()
+
+    def metrics(self):
+        now = self.clock()
+        next_due = self.next_due()
+        with self._cond:
+            depth = len(self._entries)
+            heap_size = len(self._heap)
+            due_now = sum(1 for entry in self._entries.values() if entry[0] <= now)
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "leader": self.leader,
+            "pid": os.getpid(),
+            "queue_depth": depth,
+            "heap_size": heap_size,
+            "due_now": due_now,
+            "next_due_in": None if next_due is None else round(next_due - now, 3),
+            "last_change_id": self._last_change,
+            **self.stats
+        }
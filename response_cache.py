@@ -0,0 +1,271 @@
+# ==================================================
+# SHARED RESPONSE CACHE
+# Final response bodies kept in a local SQLite file so
+# every worker process on the host shares them.
+# ==================================================
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from functools import wraps
+
+from flask import request, make_response
+
+
+class ResponseCache:
+    """Cross-process cache of serialized responses.
+
+    Keys combine the app namespace, route, output format, query string and
+    the current generation of every table the route reads. Mutating routes
+    call bump() for the tables they change, so stale entries are simply never
+    looked up again and age out through LRU eviction once the byte budget is
+    exceeded. ttl bounds staleness for changes made outside the apps.
+
+    Two hooks keep the cache from undoing read-your-writes:
+    bypass(tables) -> True skips the cache for the request (a client that
+    just wrote and is pinned to the primary). used_replica() -> True means the
+    view read from a replica; such a body is only stored once replica_lag
+    seconds have passed since the tables were last bumped, so a replica
+    that hasn't caught up can't file stale data under the new generation.
+
+    A bump that fails (e.g. the file stays locked) is retried, logged, and
+    remembered: this process stops reading those tables from the cache
+    and retries the bump on each request until it succeeds.
+    """
+
+    BUMP_ATTEMPTS = 3
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS entries (
+        key TEXT PRIMARY KEY,
+        body BLOB,
+        mimetype TEXT,
+        status INTEGER,
+        size INTEGER,
+        created REAL,
+        last_used REAL
+    );
+    CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+    CREATE TABLE IF NOT EXISTS generations (name TEXT PRIMARY KEY, gen INTEGER, bumped_at REAL);
+    CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER);
+    """
+
+    def __init__(self, path, namespace, max_bytes=64 * 1024 * 1024, ttl=60, enabled=True,
+                 replica_lag=0.0, logger=None):
+        self.path = path
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.enabled = enabled
+        self.replica_lag = replica_lag
+        self.bypass = None
+        self.used_replica = None
+        self.logger = logger or logging.getLogger("response_cache")
+        self._unbumped = set()  # tables whose last bump failed
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pending = {"hits": 0, "misses": 0}
+
+    def _db(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.executescript(self.SCHEMA)
+            try:
+                # cache files created before bumped_at existed
+                conn.execute("ALTER TABLE generations ADD COLUMN bumped_at REAL")
+            except sqlite3.OperationalError:
+                pass
+            self._local.conn = conn
+        return conn
+
+    def after_fork(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    # ---------- generations ----------
+    def bump(self, *tables):
+        if not self.enabled:
+            return
+        with self._lock:
+            tables = set(tables) | self._unbumped
+        for attempt in range(self.BUMP_ATTEMPTS):
+            try:
+                now = time.time()
+                self._db().executemany(
+                    "INSERT INTO generations (name, gen, bumped_at) VALUES (?, 1, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET gen = gen + 1, bumped_at = excluded.bumped_at",
+                    [(t, now) for t in sorted(tables)]
+                )
+            except sqlite3.Error as e:
+                error = e
+                time.sleep(0.01 * (attempt + 1))
+                continue
+            with self._lock:
+                self._unbumped -= tables
+            return
+        with self._lock:
+            self._unbumped |= tables
+        self.logger.error("cache generation bump failed for %s, not reading them from the cache: %s",
+                          ", ".join(sorted(tables)), error)
+
+    def _stale(self, tables):
+        """True while a failed bump covers any of tables (retrying it once)."""
+        with self._lock:
+            if not self._unbumped:
+                return False
+        self.bump()
+        with self._lock:
+            return bool(self._unbumped.intersection(tables))
+
+    def _generation_rows(self, tables):
+        marks = ",".join("?" * len(tables))
+        rows = {name: (gen, bumped_at) for name, gen, bumped_at in self._db().execute(
+            f"SELECT name, gen, bumped_at FROM generations WHERE name IN ({marks})", tables).fetchall()}
+        gens = [rows.get(t, (0, None))[0] for t in tables]
+        last_bump = max((r[1] or 0.0 for r in rows.values()), default=0.0)
+        return gens, last_bump
+
+    def generations(self, tables):
+        return self._generation_rows(tables)[0]
+
+    # ---------- entries ----------
+    def _key(self, tables):
+        """Cache key for this request, and when its tables last changed."""
+        fmt = request.args.get("format", "").lower()
+        accept = request.headers.get("Accept", "").lower()
+        query = "&".join(sorted(f"{k}={v}" for k, v in request.args.items(multi=True)))
+        gens, last_bump = self._generation_rows(tables)
+        raw = "|".join([self.namespace, request.path, fmt, accept, query, ",".join(map(str, gens))])
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest(), last_bump
+
+    def make_key(self, tables):
+        return self._key(tables)[0]
+
+    def storable(self, last_bump):
+        """False for a replica read that may predate the latest bump."""
+        if not (self.used_replica and self.used_replica()):
+            return True
+        return time.time() - last_bump > self.replica_lag
+
+    def get(self, key):
+        db = self._db()
+        row = db.execute(
+            "SELECT body, mimetype, status, created, last_used FROM entries WHERE key=?", (key,)
+        ).fetchone()
+        now = time.time()
+        if row is None or now - row[3] > self.ttl:
+            self._count("misses")
+            return None
+        if now - row[4] > 1:
+            # LRU bookkeeping, at most once a second per entry
+            db.execute("UPDATE entries SET last_used=? WHERE key=?", (now, key))
+        self._count("hits")
+        return row[0], row[1], row[2]
+
+    def put(self, key, body, mimetype, status):
+        size = len(body)
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            old = db.execute("SELECT size FROM entries WHERE key=?", (key,)).fetchone()
+            db.execute(
+                "INSERT OR REPLACE INTO entries (key, body, mimetype, status, size, created, last_used) "
+                "VALUES (?,?,?,?,?,?,?)", (key, body, mimetype, status, size, now, now))
+            total = self._add_counter(db, "bytes", size - (old[0] if old else 0))
+            evicted = 0
+            while total > self.max_bytes:
+                victims = db.execute(
+                    "SELECT key, size FROM entries WHERE key != ? ORDER BY last_used LIMIT 64", (key,)
+                ).fetchall()
+                if not victims:
+                    break
+                db.executemany("DELETE FROM entries WHERE key=?", [(k,) for k, _ in victims])
+                freed = sum(s for _, s in victims)
+                total = self._add_counter(db, "bytes", -freed)
+                evicted += len(victims)
+            if evicted:
+                self._add_counter(db, "evictions", evicted)
+            db.execute("COMMIT")
+        except sqlite3.Error:
+            db.execute("ROLLBACK")
+            raise
+
+    # ---------- metrics ----------
+    def _add_counter(self, db, name, delta):
+        db.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value", (name, delta))
+        return db.execute("SELECT value FROM counters WHERE name=?", (name,)).fetchone()[0]
+
+    def _count(self, name):
+        # hit/miss counts are batched per process and written every 100 lookups
+        with self._lock:
+            self._pending[name] += 1
+            if self._pending["hits"] + self._pending["misses"] < 100:
+                return
+            pending, self._pending = self._pending, {"hits": 0, "misses": 0}
+        self._flush_counts(pending)
+
+    def _flush_counts(self, pending):
+        db = self._db()
+        for name, delta in pending.items():
+            if delta:
+                self._add_counter(db, name, delta)
+
+    def stats(self):
+        with self._lock:
+            pending, self._pending = self._pending, {"hits": 0, "misses": 0}
+        self._flush_counts(pending)
+        db = self._db()
+        counters = dict(db.execute("SELECT name, value FROM counters").fetchall())
+        entries = db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "entries": entries,
+            "bytes": counters.get("bytes", 0),
+            "max_bytes": self.max_bytes,
+            "evictions": counters.get("evictions", 0)
+        }
+
+    # ---------- view decorator ----------
+    def cached(self, *tables):
+        """Serve GETs from the cache; tables are the ones the view reads."""
+        def decorator(f):
+            @wraps(f)
+            def view(*args, **kwargs):
+                if not self.enabled or request.method != "GET" or (self.bypass and self.bypass(tables)) \
+                        or self._stale(tables):
+                    return f(*args, **kwargs)
+                try:
+                    key, last_bump = self._key(tables)
+                    hit = self.get(key)
+                except sqlite3.Error:
+                    return f(*args, **kwargs)
+                if hit:
+                    body, mimetype, status = hit
+                    response = make_response(body, status)
+                    response.mimetype = mimetype
+                    response.headers["X-Cache"] = "HIT"
+                    return response
+                response = make_response(f(*args, **kwargs))
+                if response.status_code == 200 and not response.direct_passthrough \
+                        and self.storable(last_bump):
+                    try:
+                        self.put(key, response.get_data(), response.mimetype, response.status_code)
+                    except sqlite3.Error:
+                        pass
+                response.headers["X-Cache"] = "MISS"
+                return response
+            return view
+        return decorator
@@ -0,0 +1,283 @@
+# ==================================================
+# TOKEN REVOCATION
+# Revoked token ids (the jti claim) live in the
+# revoked_tokens table until the token would have
+# expired anyway. Each process keeps a Bloom filter of
+# them, so token_required only queries the table for
+# the rare jti the filter can't rule out.
+# ==================================================
+
+import bisect
+import datetime
+import hashlib
+import logging
+import math
+import threading
+import time
+
+REVOKED_TOKENS_SQL = """
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    jti VARCHAR(64) UNIQUE,
+    expires_at DATETIME,
+    revoked_at DATETIME
+)"""
+
+
+class BloomFilter:
+    """Set membership with no false negatives and ~error_rate false positives."""
+
+    def __init__(self, capacity=10000, error_rate=0.001):
+        self.capacity = max(1, capacity)
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        # double hashing: k positions from one 128-bit digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        """Set the key's bits; only counted if it set a new one (re-adds are free)."""
+        new = False
+        for p in self._positions(key):
+            mask = 1 << (p & 7)
+            if not self.bits[p >> 3] & mask:
+                self.bits[p >> 3] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+
+class RevocationError(RuntimeError):
+    """The revocation couldn't be recorded; the token stays valid until it expires."""
+
+
+def utcnow():
+    return datetime.datetime.utcnow().replace(microsecond=0)
+
+
+class TokenRevocations:
+    """Revocation store plus a per-process Bloom filter kept in sync by polling.
+
+    Every `poll_interval` seconds one request in the process reads the rows
+    added since the last poll (by id), so a revocation made in any worker or
+    app is seen everywhere within that interval (each poll re-reads the
+    last POLL_OVERLAP ids too, in case a lower id committed late). Bloom
+    filters can't drop keys, so once REBUILD_SHARE of the entries have
+    expired (or the filter is full) a background thread rebuilds it from
+    the live rows. Expired rows are deleted by purge_expired(), not here.
+    """
+
+    POLL_OVERLAP = 50
+    REBUILD_SHARE = 0.5
+
+    def __init__(self, connect, poll_interval=2.0, capacity=10000, error_rate=0.001,
+                 clock=time.time, logger=None):
+        self.connect = connect
+        self.poll_interval = poll_interval
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.clock = clock
+        self.logger = logger or logging.getLogger("revocation")
+        self._lock = threading.Lock()
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._last_id = 0
+        self._next_poll = 0.0
+        self._expiries = []  # sorted expires_at, one per entry in the filter
+        self._loaded = False
+        self._rebuilder = None
+        self._cleared = set()  # Bloom false positives already checked against the table
+        self._adds = 0
+        self.stats = {"checks": 0, "bloom_hits": 0, "store_lookups": 0, "revoked_hits": 0,
+                      "polls": 0, "rebuilds": 0, "purged": 0, "errors": 0}
+
+    # ---------- writes ----------
+    def revoke(self, jti, expires_at):
+        """Record a revoked jti until expires_at (naive UTC). Idempotent.
+
+        Raises RevocationError if the store can't be written.
+        """
+        if expires_at <= utcnow():
+            return False  # already expired, nothing to deny
+        try:
+            db = self.connect(); cur = db.cursor()
+            try:
+                cur.execute("INSERT IGNORE INTO revoked_tokens (jti, expires_at, revoked_at) "
+                            "VALUES (%s,%s,%s)", (jti, expires_at, utcnow()))
+                db.commit()
+            finally:
+                db.close()
+        except Exception as e:
+            self.stats["errors"] += 1
+            self.logger.error("token revocation not recorded: %s", e)
+            raise RevocationError(str(e)) from e
+        with self._lock:
+            self._add(jti, expires_at)
+        return True
+
+    def _add(self, jti, expires_at):
+        if self._bloom.add(jti):
+            bisect.insort(self._expiries, expires_at)  # nearly always appends: newest expires last
+        self._cleared.discard(jti)
+        self._adds += 1
+
+    def purge_expired(self):
+        """Delete rows whose token has expired. Run from one place (flask purge-revoked-tokens)."""
+        db = self.connect(); cur = db.cursor()
+        try:
+            cur.execute("DELETE FROM revoked_tokens WHERE expires_at <= %s", (utcnow(),))
+            purged = cur.rowcount
+            db.commit()
+        finally:
+            db.close()
+        self.stats["purged"] += purged
+        return purged
+
+    # ---------- sync ----------
+    def sync(self, force=False):
+        """Poll for new revocations. force (or the first call) loads the filter in full, in this thread.
+
+        A failed load or poll is logged and retried after poll_interval;
+        until the first load succeeds no token is treated as revoked.
+        """
+        now = self.clock()
+        if not force and now < self._next_poll:
+            return
+        # the first load makes concurrent requests wait for it, not pass unchecked
+        if not self._lock.acquire(blocking=force or not self._loaded):
+            return  # another thread is already polling
+        try:
+            if not force and now < self._next_poll:
+                return  # done (or failed) while we waited for the lock
+            self._next_poll = now + self.poll_interval
+            if force or not self._loaded:
+                self._rebuild()
+            else:
+                self._poll()
+                if self._needs_rebuild():
+                    self._rebuilder = threading.Thread(target=self._rebuild_in_background, name="revocation-rebuild",
+                                                       daemon=True)
+                    self._rebuilder.start()
+        except Exception as e:
+            self.stats["errors"] += 1
+            self.logger.error("revocation %s failed, retrying in %ss: %s",
+                              "poll" if self._loaded else "load", self.poll_interval, e)
+        finally:
+            self._lock.release()
+
+    def _poll(self):
+        db = self.connect(); cur = db.cursor()
+        try:
+            cur.execute("SELECT id, jti, expires_at FROM revoked_tokens WHERE id > %s ORDER BY id",
+                        (max(0, self._last_id - self.POLL_OVERLAP),))
+            rows = cur.fetchall()
+        finally:
+            db.close()
+        for r in rows:
+            self._add(r["jti"], r["expires_at"])
+            self._last_id = max(self._last_id, r["id"])
+        self.stats["polls"] += 1
+
+    def _needs_rebuild(self):
+        if self._rebuilder is not None and self._rebuilder.is_alive():
+            return False
+        expired = self._expired()
+        return (expired > 0 and expired >= self.REBUILD_SHARE * self._bloom.count) \
+            or self._bloom.count >= self._bloom.capacity
+
+    def _expired(self):
+        return bisect.bisect_right(self._expiries, utcnow())
+
+    def _rebuild_in_background(self):
+        try:
+            loaded = self._load()
+            with self._lock:
+                self._install(*loaded)
+        except Exception as e:
+            self.stats["errors"] += 1
+            self.logger.error("revocation filter rebuild failed: %s", e)
+
+    def _rebuild(self):
+        self._install(*self._load())
+
+    def _load(self):
+        # runs without the lock in the background: requests keep the old filter meanwhile
+        db = self.connect(); cur = db.cursor()
+        try:
+            cur.execute("SELECT MAX(id) AS id FROM revoked_tokens")
+            row = cur.fetchone()
+            last_id = (row and row["id"]) or 0
+            cur.execute("SELECT jti, expires_at FROM revoked_tokens WHERE expires_at > %s", (utcnow(),))
+            rows = cur.fetchall()
+        finally:
+            db.close()
+        bloom = BloomFilter(max(self.capacity, 2 * len(rows)), self.error_rate)
+        expiries = sorted(r["expires_at"] for r in rows if bloom.add(r["jti"]))
+        return bloom, expiries, last_id
+
+    def _install(self, bloom, expiries, last_id):
+        # call with self._lock held
+        self._bloom, self._expiries = bloom, expiries
+        self._cleared = set()
+        self._adds += 1
+        # anything newer than the load, including revoke()s that went into the
+        # old filter meanwhile, is read again by the next poll (made due now)
+        self._last_id = last_id
+        self._next_poll = 0.0 if self._loaded else self._next_poll
+        self._loaded = True
+        self.stats["rebuilds"] += 1
+
+    # ---------- token_required ----------
+    def is_revoked(self, jti):
+        """True if jti has been revoked. Tokens without a jti can't be revoked."""
+        if not jti:
+            return False
+        self.stats["checks"] += 1
+        self.sync()
+        if jti not in self._bloom:
+            return False
+        self.stats["bloom_hits"] += 1
+        if jti in self._cleared:
+            return False
+        # possible false positive: confirm against the table
+        self.stats["store_lookups"] += 1
+        adds = self._adds
+        db = self.connect(); cur = db.cursor()
+        try:
+            cur.execute("SELECT expires_at FROM revoked_tokens WHERE jti = %s", (jti,))
+            row = cur.fetchone()
+        finally:
+            db.close()
+        if row is None or row["expires_at"] <= utcnow():
+            with self._lock:
+                # skip caching if a revocation landed while we were looking
+                if adds == self._adds and len(self._cleared) < 10000:
+                    self._cleared.add(jti)
+            return False
+        self.stats["revoked_hits"] += 1
+        return True
+
+    def after_fork(self):
+        self._lock = threading.Lock()
+        self._rebuilder = None
+
+    def status(self):
+        return {
+            "loaded": self._loaded,
+            "entries": self._bloom.count,
+            "filter_bits": self._bloom.size,
+            "filter_hashes": self._bloom.hashes,
+            "expired_entries": self._expired(),
+            "next_expiry": next((e.isoformat() for e in self._expiries[self._expired():]), None),
+            **self.stats
+        }
@@ -3,6 +3,9 @@ CREATE DATABASE IF NOT EXISTS chore_db;
 USE chore_db;
 
 -- Drop tables if exist (useful for re-run)
+DROP TABLE IF EXISTS reminder_changes;
+DROP TABLE IF EXISTS revoked_tokens;
+DROP TABLE IF EXISTS chore_assignments_archive;
 DROP TABLE IF EXISTS chore_assignments;
 DROP TABLE IF EXISTS chores;
 DROP TABLE IF EXISTS members;
@@ -32,6 +35,19 @@ CREATE TABLE chore_assignments (
   FOREIGN KEY (chore_id) REFERENCES chores(chore_id)
 );
 
+-- open assignments by date (archival job, due-date scans)
+CREATE INDEX idx_assignments_open ON chore_assignments (is_completed, assigned_date);
+
+-- completed assignments moved out of the hot table (see archive.py)
+CREATE TABLE chore_assignments_archive (
+  assignment_id INT PRIMARY KEY,
+  member_id INT,
+  chore_id INT,
+  assigned_date DATE,
+  is_completed BOOLEAN,
+  archived_at DATETIME
+);
+
 -- simple users table for authentication
 CREATE TABLE users (
   user_id INT AUTO_INCREMENT PRIMARY KEY,
@@ -39,6 +55,20 @@ CREATE TABLE users (
   password VARCHAR(200) NOT NULL -- store hashed passwords (for demo we will use plain; in production hash)
 );
 
+-- revoked JWT ids, kept until the token's own expiry (see revocation.py)
+CREATE TABLE revoked_tokens (
+  id INT AUTO_INCREMENT PRIMARY KEY,
+  jti VARCHAR(64) UNIQUE,
+  expires_at DATETIME,
+  revoked_at DATETIME
+);
+
+-- assignment ids written since the reminder scheduler last polled (see reminders.py)
+CREATE TABLE reminder_changes (
+  id INT AUTO_INCREMENT PRIMARY KEY,
+  assignment_id INT
+);
+
 -- seed members (5)
 INSERT INTO members (name) VALUES
 ('Jezelle'),('Mark'),('Ana'),('Rico'),('Mae');
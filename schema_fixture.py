@@ -0,0 +1,23 @@
+# ==================================================
+# TEST FIXTURE: schema.sql ON A THROWAWAY SQLITE FILE
+# ==================================================
+
+import os
+import tempfile
+
+from storage import SQLiteBackend
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema.sql")
+
+
+def schema_backend(testcase, name="test.db"):
+    """A SQLiteBackend loaded with schema.sql (and its seed rows) in a temp
+    dir that is removed when the test finishes. The dir is `backend.dir`.
+    """
+    tmp = tempfile.TemporaryDirectory()
+    testcase.addCleanup(tmp.cleanup)
+    backend = SQLiteBackend(os.path.join(tmp.name, name))
+    backend.dir = tmp.name
+    with open(SCHEMA_PATH) as f:
+        backend.executescript(f.read())
+    return backend
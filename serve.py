@@ -0,0 +1,91 @@
+# ==================================================
+# PRODUCTION SERVER
+# Preforking gunicorn server for either Flask app:
+#   flask --app app serve --workers 4 --threads 8
+#   flask --app login serve --bind 0.0.0.0:8001
+# ==================================================
+
+import multiprocessing
+import os
+
+import click
+
+
+def default_workers():
+    return int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+
+
+def gunicorn_options(bind="127.0.0.1:8000", workers=None, threads=4, keepalive=5, timeout=30,
+                     graceful_timeout=30, max_requests=10000, on_fork=None, on_exit=None):
+    """gunicorn settings for run(); unset (None) values keep gunicorn's defaults."""
+    options = {
+        "bind": bind,
+        "workers": workers or default_workers(),
+        "threads": threads,
+        "worker_class": "gthread" if threads > 1 else "sync",
+        "preload_app": True,
+        "keepalive": keepalive,
+        "timeout": timeout,
+        "graceful_timeout": graceful_timeout,
+        "max_requests": max_requests,
+        "max_requests_jitter": max_requests // 10,
+        "backlog": 2048,
+        "accesslog": os.environ.get("ACCESS_LOG"),
+        "post_fork": lambda server, worker: on_fork() if on_fork else None,
+        "worker_exit": lambda server, worker: on_exit() if on_exit else None,
+    }
+    if os.path.isdir("/dev/shm"):
+        # heartbeat file on tmpfs so a slow disk can't stall workers
+        options["worker_tmp_dir"] = "/dev/shm"
+    return options
+
+
+def run(app, bind="127.0.0.1:8000", workers=None, threads=4, keepalive=5, timeout=30,
+        graceful_timeout=30, max_requests=10000, on_start=None, on_fork=None, on_exit=None):
+    """Serve `app` with gunicorn.
+
+    The app is imported once in the master (preload) and forked into the
+    workers. SIGHUP replaces workers gracefully and SIGTERM stops accepting
+    connections and waits up to graceful_timeout for in-flight requests.
+    on_start runs once in the master before any worker forks (schema
+    setup); on_fork runs in every worker right after the fork (reset
+    inherited connections, warm pools); on_exit runs as a worker shuts down.
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        raise click.ClickException("gunicorn is not installed (pip install gunicorn); "
+                                   "it does not run on Windows")
+
+    options = gunicorn_options(bind, workers, threads, keepalive, timeout, graceful_timeout, max_requests,
+                               on_fork, on_exit)
+    if on_start:
+        on_start()
+
+    class Server(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                if value is not None:
+                    self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    Server().run()
+
+
+def command(app, on_start=None, on_fork=None, on_exit=None):
+    """A `flask serve` CLI command bound to `app`."""
+    @click.command("serve")
+    @click.option("--bind", default=os.environ.get("BIND", "127.0.0.1:8000"), show_default=True)
+    @click.option("--workers", type=int, default=None, help="Worker processes [default: 2 x CPUs + 1].")
+    @click.option("--threads", type=int, default=int(os.environ.get("THREADS", "4")), show_default=True)
+    @click.option("--keepalive", type=int, default=5, show_default=True, help="Seconds to hold idle keep-alive connections.")
+    @click.option("--timeout", type=int, default=30, show_default=True)
+    @click.option("--graceful-timeout", type=int, default=30, show_default=True, help="Seconds to drain requests on reload/shutdown.")
+    @click.option("--max-requests", type=int, default=10000, show_default=True, help="Recycle a worker after this many requests.")
+    def serve(bind, workers, threads, keepalive, timeout, graceful_timeout, max_requests):
+        """Run the app on a preforking production server."""
+        run(app, bind, workers, threads, keepalive, timeout, graceful_timeout, max_requests,
+            on_start=on_start, on_fork=on_fork, on_exit=on_exit)
+    return serve
@@ -0,0 +1,297 @@
+# ==================================================
+# STORAGE BACKENDS
+# MySQL (default) or embedded SQLite behind the same
+# connect() / cursor() / commit() / close() interface.
+# ==================================================
+
+import datetime
+import functools
+import re
+import sqlite3
+import threading
+import time
+
+
+# ==================================================
+# CONNECTION POOL
+# ==================================================
+class PooledConnection:
+    """Hands the underlying connection back to its pool on close()."""
+
+    def __init__(self, conn, pool):
+        self._conn = conn
+        self._pool = pool
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def close(self):
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._pool.release(conn)
+
+
+class ConnectionPool:
+    """LIFO pool of idle connections; connections idle past `recycle` are reopened."""
+
+    def __init__(self, open_connection, size=10, recycle=300):
+        self.open_connection = open_connection
+        self.size = size
+        self.recycle = recycle
+        self._idle = []
+        self._lock = threading.Lock()
+        self.stats = {"opened": 0, "reused": 0, "discarded": 0}
+
+    def acquire(self):
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn, since = self._idle.pop()
+            if now - since < self.recycle:
+                self.stats["reused"] += 1
+                return PooledConnection(conn, self)
+            self._discard(conn)
+        self.stats["opened"] += 1
+        return PooledConnection(self.open_connection(), self)
+
+    def release(self, conn):
+        try:
+            conn.rollback()
+        except Exception:
+            self._discard(conn)
+            return
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append((conn, time.monotonic()))
+                return
+        self._discard(conn)
+
+    def _discard(self, conn):
+        self.stats["discarded"] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def warm_up(self, count=None):
+        """Open connections ahead of the first requests."""
+        count = min(self.size, self.size if count is None else count)
+        opened = [self.acquire() for _ in range(count - len(self._idle))]
+        for conn in opened:
+            conn.close()
+        return len(self._idle)
+
+    def reset_after_fork(self):
+        """Forget connections inherited from the parent without closing them,
+        since closing would also end the parent's session on the shared socket."""
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._discard(conn)
+
+
+# ==================================================
+# MYSQL
+# ==================================================
+class MySQLBackend:
+    name = "mysql"
+
+    def __init__(self, host, user, password, database, port=3306, pool_size=10):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.database = database
+        self.pool = ConnectionPool(self._open, size=pool_size) if pool_size else None
+
+    def connect(self):
+        if self.pool is not None:
+            return self.pool.acquire()
+        return self._open()
+
+    def connect_unpooled(self):
+        """A connection of its own, e.g. to hold a session-scoped named lock."""
+        return self._open()
+
+    def _open(self):
+        import MySQLdb
+        import MySQLdb.cursors
+        return MySQLdb.connect(
+            host=self.host,
+            port=self.port,
+            user=self.user,
+            passwd=self.password,
+            db=self.database,
+            cursorclass=MySQLdb.cursors.DictCursor,
+            autocommit=False,
+            charset="utf8mb4"
+        )
+
+    def after_fork(self):
+        if self.pool is not None:
+            self.pool.reset_after_fork()
+
+    def replica(self, host, port=3306):
+        """Same credentials and database on another server."""
+        return MySQLBackend(host, self.user, self.password, self.database, port,
+                            self.pool.size if self.pool else 0)
+
+    def executescript(self, script):
+        db = self.connect(); cur = db.cursor()
+        try:
+            for statement in split_script(script):
+                cur.execute(statement)
+            db.commit()
+        finally:
+            db.close()
+
+
+# ==================================================
+# SQLITE
+# ==================================================
+_REWRITES = [
+    (re.compile(r"\bINT(?:EGER)?\s+AUTO_INCREMENT\s+PRIMARY\s+KEY\b", re.I), "INTEGER PRIMARY KEY AUTOINCREMENT"),
+    (re.compile(r"\bINSERT\s+IGNORE\b", re.I), "INSERT OR IGNORE"),
+    (re.compile(r"\bNOW\(\)", re.I), "CURRENT_TIMESTAMP"),
+    (re.compile(r"\bCURDATE\(\)", re.I), "DATE('now')"),
+    # one writer at a time already; the write lock is taken by the first write
+    (re.compile(r"\s+FOR\s+UPDATE\b", re.I), ""),
+    (re.compile(r"%s"), "?"),
+]
+
+@functools.lru_cache(maxsize=512)
+def translate(sql):
+    """Rewrite the MySQL dialect used by the apps into SQLite."""
+    for pattern, replacement in _REWRITES:
+        sql = pattern.sub(replacement, sql)
+    return sql
+
+def split_script(script):
+    """Split a .sql file into statements, dropping comments and CREATE DATABASE/USE."""
+    script = re.sub(r"--[^\n]*", "", script)
+    statements = []
+    for statement in script.split(";"):
+        statement = statement.strip()
+        if not statement or re.match(r"(CREATE\s+DATABASE|USE)\b", statement, re.I):
+            continue
+        statements.append(statement)
+    return statements
+
+def _dict_row(cursor, row):
+    return {d[0]: row[i] for i, d in enumerate(cursor.description)}
+
+# DATE columns come back as datetime.date, like MySQLdb
+sqlite3.register_adapter(datetime.date, lambda d: d.isoformat())
+sqlite3.register_adapter(datetime.datetime, lambda d: d.isoformat(" "))
+sqlite3.register_converter("DATE", lambda b: datetime.date.fromisoformat(b.decode()))
+sqlite3.register_converter("DATETIME", lambda b: datetime.datetime.fromisoformat(b.decode()))
+
+
+class SQLiteCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, sql, params=()):
+        return self._cursor.execute(translate(sql), tuple(params or ()))
+
+    def executemany(self, sql, rows):
+        return self._cursor.executemany(translate(sql), [tuple(r) for r in rows])
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def fetchmany(self, size=None):
+        return self._cursor.fetchmany(size or self._cursor.arraysize)
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """Per-thread connection; close() ends the transaction but keeps the handle."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self, *args):
+        return SQLiteCursor(self._conn.cursor())
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        if self._conn.in_transaction:
+            self._conn.rollback()
+
+
+class SQLiteBackend:
+    name = "sqlite"
+    pool = None  # connections are already kept per thread
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, timeout=5, detect_types=sqlite3.PARSE_DECLTYPES)
+        conn.row_factory = _dict_row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = SQLiteConnection(self._open())
+        return conn
+
+    def after_fork(self):
+        # SQLite handles must not cross a fork; each process opens its own
+        self._local = threading.local()
+
+    def replica(self, host, port=3306):
+        raise ValueError("read replicas are not supported with the sqlite backend")
+
+    def executescript(self, script):
+        db = self.connect(); cur = db.cursor()
+        try:
+            for statement in split_script(script):
+                cur.execute(statement)
+            db.commit()
+        finally:
+            db.close()
+
+
+def create_backend(name, config, sqlite_path="house_chores.db", pool_size=10):
+    """config holds host/user/password/database (and optional port) for MySQL."""
+    if name == "sqlite":
+        return SQLiteBackend(sqlite_path)
+    if name == "mysql":
+        return MySQLBackend(config["host"], config["user"], config["password"],
+                            config["database"], config.get("port", 3306), pool_size)
+    raise ValueError(f"unknown DB_BACKEND: {name}")
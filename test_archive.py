@@ -0,0 +1,90 @@
+import datetime
+import unittest
+from archive import archive_completed, assignments_source, next_month, initial_partition_sql
+from schema_fixture import schema_backend
+
+class ArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = schema_backend(self, "archive.db")
+
+    def count(self, sql):
+        cur = self.backend.connect().cursor()
+        cur.execute(sql)
+        return list(cur.fetchone().values())[0]
+
+    def test_moves_only_old_completed_rows_in_batches(self):
+        # schema.sql seeds 10 completed rows dated 2025-01-01 .. 2025-01-08
+        moved = archive_completed(self.backend.connect, older_than_days=0, batch_size=3,
+                                  today=datetime.date(2025, 1, 5))
+        self.assertEqual(moved, 5)
+        self.assertEqual(self.count("SELECT COUNT(*) FROM chore_assignments_archive"), 5)
+        self.assertEqual(self.count("SELECT COUNT(*) FROM chore_assignments"), 15)
+        self.assertEqual(self.count(
+            "SELECT COUNT(*) FROM chore_assignments WHERE is_completed = 1 AND assigned_date < '2025-01-05'"), 0)
+
+    def test_include_archived_unions_both_tables(self):
+        archive_completed(self.backend.connect, older_than_days=0, today=datetime.date(2026, 1, 1))
+        hot = self.count(f"SELECT COUNT(*) FROM {assignments_source()} a")
+        both = self.count(f"SELECT COUNT(*) FROM {assignments_source(True)} a")
+        self.assertEqual((hot, both), (10, 20))
+
+    def test_reopened_row_is_not_archived(self):
+        class ReopenAfterSelect:
+            # another writer reopens a picked row between the SELECT and the copy
+            def __init__(self, conn):
+                self.conn, self.cur = conn, conn.cursor()
+            def cursor(self):
+                return self
+            def execute(self, sql, params=()):
+                self.cur.execute(sql, params)
+                if sql.startswith("SELECT assignment_id"):
+                    rows = self.cur.fetchall()
+                    self.conn.cursor().execute(
+                        "UPDATE chore_assignments SET is_completed = 0 WHERE assignment_id = %s",
+                        (rows[0]["assignment_id"],))
+                    self.rows = rows
+            def fetchall(self):
+                return self.rows
+            def __getattr__(self, name):
+                return getattr(self.cur if hasattr(self.cur, name) else self.conn, name)
+        moved = archive_completed(lambda: ReopenAfterSelect(self.backend.connect()),
+                                  older_than_days=0, today=datetime.date(2026, 1, 1))
+        self.assertEqual(moved, 9)
+        self.assertEqual(self.count("SELECT COUNT(*) FROM chore_assignments_archive"), 9)
+        self.assertEqual(self.count("SELECT COUNT(*) FROM chore_assignments"), 11)
+
+    def test_batches_walk_the_open_index(self):
+        statements = []
+        class Recording:
+            def __init__(self, conn):
+                self.conn, self.cur = conn, conn.cursor()
+            def cursor(self):
+                return self
+            def execute(self, sql, params=()):
+                if sql.startswith("SELECT assignment_id"):
+                    statements.append((sql, list(params)))
+                return self.cur.execute(sql, params)
+            def __getattr__(self, name):
+                return getattr(self.cur if hasattr(self.cur, name) else self.conn, name)
+        archive_completed(lambda: Recording(self.backend.connect()), older_than_days=0, batch_size=4,
+                          today=datetime.date(2026, 1, 1))
+        # later batches start after the previous batch's last (assigned_date, assignment_id)
+        self.assertNotIn("assignment_id >", statements[0][0])
+        self.assertEqual(statements[1][1][1:4], [datetime.date(2025, 1, 3), datetime.date(2025, 1, 3), 7])
+        cur = self.backend.connect().cursor()
+        cur.execute("EXPLAIN QUERY PLAN " + statements[1][0].replace(" FOR UPDATE", "").replace("%s", "?"),
+                    statements[1][1])
+        plan = " ".join(r["detail"] for r in cur.fetchall())
+        self.assertIn("idx_assignments_open", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_partition_bound_is_a_literal(self):
+        sql = initial_partition_sql(datetime.date(2026, 10, 19))
+        self.assertIn("TO_DAYS('2026-10-01')", sql)
+        self.assertNotIn("CURDATE", sql)
+
+    def test_next_month(self):
+        self.assertEqual(next_month(datetime.date(2025, 12, 1)), datetime.date(2026, 1, 1))
+
+if __name__ == "__main__":
+    unittest.main()
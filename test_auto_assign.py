@@ -0,0 +1,78 @@
+import datetime
+import time
+import unittest
+from auto_assign import plan_assignments, occurrences, load_planning_data
+
+START = datetime.date(2025, 1, 6)  # a Monday
+
+class AutoAssignTest(unittest.TestCase):
+    def test_frequency_sets_occurrences(self):
+        chores = [{"chore_id": 1, "frequency": "Daily"}, {"chore_id": 2, "frequency": "Weekly"}]
+        slots = occurrences(chores, START, 14)
+        self.assertEqual(sum(1 for s in slots if s[2] == 1), 14)
+        self.assertEqual(sum(1 for s in slots if s[2] == 2), 2)
+
+    def test_workload_is_balanced(self):
+        chores = [{"chore_id": c, "frequency": "Daily"} for c in range(1, 4)]
+        plan, unassigned, loads = plan_assignments([1, 2, 3], chores, START, days=7)
+        self.assertEqual(unassigned, [])
+        self.assertEqual(len(plan), 21)
+        self.assertEqual(set(loads.values()), {7})
+
+    def test_no_same_chore_on_consecutive_days(self):
+        chores = [{"chore_id": 1, "frequency": "Daily"}]
+        plan, _, _ = plan_assignments([1, 2], chores, START, days=6)
+        members = [p["member_id"] for p in plan]
+        self.assertTrue(all(a != b for a, b in zip(members, members[1:])))
+
+    def test_history_counts_for_consecutive_rule(self):
+        chores = [{"chore_id": 1, "frequency": "Daily"}]
+        history = [(1, 1, START - datetime.timedelta(days=1))]
+        plan, _, _ = plan_assignments([1, 2], chores, START, days=1, history=history)
+        self.assertEqual(plan[0]["member_id"], 2)
+
+    def test_unavailable_members_are_skipped(self):
+        chores = [{"chore_id": 1, "frequency": "Daily"}]
+        plan, unassigned, _ = plan_assignments(
+            [1], chores, START, days=3, unavailable={1: ["tue", "2025-01-08"]})
+        self.assertEqual([p["assigned_date"] for p in plan], ["2025-01-06"])
+        self.assertEqual(len(unassigned), 2)
+
+    def test_carried_load_uses_weights(self):
+        class Cursor:
+            results = [[{"member_id": 1}, {"member_id": 2}],
+                       [{"chore_id": 1, "frequency": "Daily"}, {"chore_id": 2, "frequency": "Daily"}],
+                       [{"member_id": 1, "chore_id": 2, "assigned_date": START}]]
+            def execute(self, sql, params=()):
+                pass
+            def fetchall(self):
+                return self.results.pop(0)
+        _, _, _, load = load_planning_data(Cursor(), START, 7, weights={"2": 3})
+        self.assertEqual(load, {1: 3.0})
+
+    def test_large_site(self):
+        members = list(range(1, 100001))
+        chores = [{"chore_id": c, "frequency": "Daily" if c % 2 else "Weekly"} for c in range(1, 1001)]
+        began = time.perf_counter()
+        plan, unassigned, _ = plan_assignments(members, chores, START, days=7)
+        self.assertLess(time.perf_counter() - began, 5)
+        self.assertEqual(len(plan), 500 * 7 + 500)
+        self.assertEqual(len({p["member_id"] for p in plan}), len(plan))
+
+    def test_large_site_with_unavailability(self):
+        # 90% of members are away at weekends: each is set aside once per day, not once per slot
+        members = list(range(1, 100001))
+        chores = [{"chore_id": c, "frequency": "Daily"} for c in range(1, 1001)]
+        unavailable = {m: ["sat", "sun"] for m in members if m % 10}
+        unavailable[10] = ["2025-01-06"]
+        began = time.perf_counter()
+        plan, unassigned, _ = plan_assignments(members, chores, START, days=7, unavailable=unavailable)
+        self.assertLess(time.perf_counter() - began, 5)
+        self.assertEqual(unassigned, [])
+        self.assertEqual(len(plan), 7000)
+        weekend = {p["member_id"] for p in plan if p["assigned_date"] in ("2025-01-11", "2025-01-12")}
+        self.assertTrue(all(m % 10 == 0 for m in weekend))
+        self.assertFalse(any(p["member_id"] == 10 and p["assigned_date"] == "2025-01-06" for p in plan))
+
+if __name__ == "__main__":
+    unittest.main()
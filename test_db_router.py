@@ -0,0 +1,70 @@
+import sqlite3
+import unittest
+from db_router import ReplicaRouter, parse_replicas
+
+def stand_in(name):
+    # a local database that answers "which server am I?"
+    def connect():
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE server (name TEXT)")
+        conn.execute("INSERT INTO server VALUES (?)", (name,))
+        return conn
+    return connect
+
+def server_name(conn):
+    name = conn.execute("SELECT name FROM server").fetchone()[0]
+    conn.close()
+    return name
+
+class ReplicaRouterTest(unittest.TestCase):
+    def setUp(self):
+        self.lag = {"r1": 0.0, "r2": 0.0}
+        probe = lambda conn: self.lag[conn.execute("SELECT name FROM server").fetchone()[0]]
+        self.router = ReplicaRouter(stand_in("primary"), [stand_in("r1"), stand_in("r2")],
+                                    lag_check_interval=0, sticky_seconds=60, lag_probe=probe)
+
+    def test_writes_go_to_primary(self):
+        self.assertEqual(server_name(self.router.connect()), "primary")
+
+    def test_reads_round_robin(self):
+        names = [server_name(self.router.connect(readonly=True)) for _ in range(4)]
+        self.assertEqual(names, ["r1", "r2", "r1", "r2"])
+
+    def test_lagging_replica_is_skipped(self):
+        self.lag["r1"] = 30.0
+        names = {server_name(self.router.connect(readonly=True)) for _ in range(4)}
+        self.assertEqual(names, {"r2"})
+
+    def test_reader_stays_on_one_replica(self):
+        first = self.router.reader()
+        second = self.router.reader()
+        self.assertEqual({server_name(first()) for _ in range(3)}, {"r1"})
+        self.assertEqual({server_name(second()) for _ in range(3)}, {"r2"})
+        self.assertEqual([r.in_flight for r in self.router.replicas], [0, 0])
+
+    def test_reader_for_sticky_client_is_primary(self):
+        self.router.mark_write("alice")
+        self.assertEqual(server_name(self.router.reader("alice")()), "primary")
+
+    def test_all_lagging_falls_back_to_primary(self):
+        self.lag.update(r1=30.0, r2=None)
+        self.assertEqual(server_name(self.router.connect(readonly=True)), "primary")
+
+    def test_writer_sticks_to_primary(self):
+        self.router.mark_write("alice")
+        self.assertEqual(server_name(self.router.connect(readonly=True, client="alice")), "primary")
+        self.assertNotEqual(server_name(self.router.connect(readonly=True, client="bob")), "primary")
+
+    def test_least_loaded(self):
+        self.router.strategy = "least_loaded"
+        held = self.router.connect(readonly=True)
+        held_name = held.execute("SELECT name FROM server").fetchone()[0]
+        other = server_name(self.router.connect(readonly=True))
+        self.assertNotEqual(held_name, other)
+        held.close()
+
+    def test_parse_replicas(self):
+        self.assertEqual(parse_replicas("a, b:3307,"), [("a", 3306), ("b", 3307)])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from werkzeug.datastructures import MultiDict
+from schema_fixture import schema_backend
+from fields import (FieldError, requested_fields, select_list, assignment_view_sql, strip,
+                    with_overlay_key, ASSIGNMENT_FIELDS, ASSIGNMENT_VIEW_FIELDS, CHORE_FIELDS)
+
+class FieldsTest(unittest.TestCase):
+    def test_defaults_to_every_field(self):
+        self.assertEqual(requested_fields(MultiDict(), CHORE_FIELDS), list(CHORE_FIELDS))
+
+    def test_keeps_whitelist_order(self):
+        fields = requested_fields(MultiDict({"fields": "frequency, chore_id"}), CHORE_FIELDS)
+        self.assertEqual(fields, ["chore_id", "frequency"])
+
+    def test_unknown_field_rejected(self):
+        with self.assertRaises(FieldError) as ctx:
+            requested_fields(MultiDict({"fields": "chore_id,password"}), CHORE_FIELDS)
+        self.assertEqual(ctx.exception.unknown, ["password"])
+
+    def test_empty_field_list_rejected(self):
+        for raw in (",", " , ", ",,"):
+            with self.assertRaises(FieldError) as ctx:
+                requested_fields(MultiDict({"fields": raw}), CHORE_FIELDS)
+            self.assertEqual(str(ctx.exception), "no fields requested")
+
+    def test_select_list_aliases_qualified_columns(self):
+        self.assertEqual(select_list(["assignment_id"], ASSIGNMENT_FIELDS), "a.assignment_id")
+        self.assertEqual(select_list(["member_name"], {"member_name": "m.name"}), "m.name AS member_name")
+
+    def test_view_only_joins_what_fields_need(self):
+        sql = assignment_view_sql(["assignment_id", "chore_name"])
+        self.assertIn("JOIN chores", sql)
+        self.assertNotIn("JOIN members", sql)
+        self.assertIn("EXISTS (SELECT 1 FROM members m WHERE m.member_id = a.member_id)", sql)
+        self.assertNotIn("JOIN", assignment_view_sql(["assignment_id", "is_completed"]))
+
+    def test_skipped_join_drops_the_same_rows(self):
+        backend = schema_backend(self, "fields.db")
+        cur = backend.connect().cursor()
+        cur.execute("PRAGMA foreign_keys = OFF")
+        cur.execute("DELETE FROM members WHERE member_id = 1")
+        counts = []
+        for fields in (["assignment_id", "member_name"], ["assignment_id"]):
+            cur.execute(assignment_view_sql(fields))
+            counts.append(len(cur.fetchall()))
+        self.assertEqual(counts[0], counts[1])
+        full = assignment_view_sql(list(ASSIGNMENT_VIEW_FIELDS))
+        self.assertNotIn("WHERE", full)
+
+    def test_overlay_key_added_then_stripped(self):
+        fields = ["is_completed"]
+        self.assertEqual(with_overlay_key(fields), ["assignment_id", "is_completed"])
+        rows = [{"assignment_id": 1, "is_completed": 0}]
+        self.assertEqual(strip(rows, fields), [{"is_completed": 0}])
+
+if __name__ == "__main__":
+    unittest.main()
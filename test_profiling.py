@@ -0,0 +1,64 @@
+import os
+import tempfile
+import time
+import unittest
+from flask import Flask
+import profiling
+
+class ProfilingMiddlewareTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        app = Flask(__name__)
+
+        @app.route("/slow")
+        def slow():
+            deadline = time.perf_counter() + 0.03
+            while time.perf_counter() < deadline:
+                pass
+            return "done"
+
+        self.app = app
+        self.client = app.test_client()
+
+    def install(self, **kwargs):
+        return profiling.install(self.app, self.dir, token="t0ken", **kwargs)
+
+    def test_not_profiled_without_token(self):
+        middleware = self.install()
+        self.client.get("/slow")
+        self.client.get("/slow", headers={"X-Profile": "wrong"})
+        self.assertEqual(middleware.list_profiles(), [])
+
+    def test_header_writes_collapsed_stacks(self):
+        middleware = self.install()
+        self.assertEqual(self.client.get("/slow", headers={"X-Profile": "t0ken"}).data, b"done")
+        [profile] = middleware.list_profiles()
+        self.assertTrue(profile["name"].endswith(".collapsed"))
+        with open(os.path.join(self.dir, profile["name"])) as f:
+            lines = f.read().splitlines()
+        self.assertTrue(any("slow (test_profiling.py" in line for line in lines))
+        self.assertTrue(all(line.rsplit(" ", 1)[1].isdigit() for line in lines))
+
+    def test_query_parameter_and_cprofile_mode(self):
+        middleware = self.install(mode="cprofile")
+        self.client.get("/slow?_profile=t0ken")
+        [profile] = middleware.list_profiles()
+        self.assertTrue(profile["name"].endswith(".prof"))
+
+    def test_random_sampling(self):
+        middleware = self.install(sample_rate=1.0)
+        self.client.get("/slow")
+        self.assertEqual(len(middleware.list_profiles()), 1)
+
+    def test_save_prunes_old_and_surplus_profiles(self):
+        middleware = self.install(sample_rate=1.0, max_files=3, max_age=3600)
+        old = time.strftime("%Y%m%d-%H%M%S", time.localtime(time.time() - 7200))
+        open(os.path.join(self.dir, f"{old}-abcdef-GET-old-1ms.collapsed"), "w").close()
+        for _ in range(5):
+            self.client.get("/slow")
+        names = [p["name"] for p in middleware.list_profiles()]
+        self.assertEqual(len(names), 3)
+        self.assertFalse(any(old in name for name in names))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import sqlite3
+import threading
+import time
+import unittest
+from query_batch import run_concurrently
+from storage import ConnectionPool
+
+class SlowConnection:
+    # sqlite stand-in that takes `delay` seconds per query, like a remote round trip
+    def __init__(self, delay):
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self.delay = delay
+    def cursor(self):
+        return self
+    def execute(self, sql, params=()):
+        time.sleep(self.delay)
+        self.cur = self.conn.execute(sql.replace("%s", "?"), params)
+    def fetchall(self):
+        return self.cur.fetchall()
+    def rollback(self):
+        self.conn.rollback()
+    def close(self):
+        self.conn.close()
+
+class RunConcurrentlyTest(unittest.TestCase):
+    def test_results_keep_query_order(self):
+        rows = run_concurrently(lambda: SlowConnection(0), [
+            ("SELECT %s", (1,)), ("SELECT %s", (2,)), ("SELECT %s", (3,))
+        ])
+        self.assertEqual(rows, [[(1,)], [(2,)], [(3,)]])
+
+    def test_queries_overlap(self):
+        began = time.perf_counter()
+        run_concurrently(lambda: SlowConnection(0.05), [("SELECT 1", ())] * 3)
+        self.assertLess(time.perf_counter() - began, 0.12)
+
+class ConnectionPoolTest(unittest.TestCase):
+    def test_connections_are_reused(self):
+        pool = ConnectionPool(lambda: SlowConnection(0), size=2)
+        first = pool.acquire(); raw = first._conn; first.close()
+        second = pool.acquire()
+        self.assertIs(second._conn, raw)
+        self.assertEqual(pool.stats["opened"], 1)
+
+    def test_pool_size_is_capped(self):
+        pool = ConnectionPool(lambda: SlowConnection(0), size=1)
+        held = [pool.acquire() for _ in range(3)]
+        for conn in held:
+            conn.close()
+        self.assertEqual(pool.stats["discarded"], 2)
+        self.assertEqual(pool.warm_up(), 1)
+
+    def test_warm_up_opens_ahead(self):
+        pool = ConnectionPool(lambda: SlowConnection(0), size=4)
+        self.assertEqual(pool.warm_up(3), 3)
+        pool.acquire().close()
+        self.assertEqual(pool.stats["opened"], 3)
+
+    def test_reset_after_fork_forgets_without_closing(self):
+        pool = ConnectionPool(lambda: SlowConnection(0), size=2)
+        pool.warm_up()
+        pool.reset_after_fork()
+        self.assertEqual(pool.stats["discarded"], 0)
+        pool.acquire()
+        self.assertEqual(pool.stats["opened"], 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+import datetime
+import os
+import time
+import unittest
+from reminders import FileLock, ReminderScheduler
+from schema_fixture import schema_backend
+
+def at(day, hour=0):
+    return datetime.datetime.combine(datetime.date.fromisoformat(day), datetime.time(hour)).timestamp()
+
+def wait_for(check, timeout=5):
+    deadline = time.time() + timeout
+    while not check():
+        if time.time() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+class ReminderSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = schema_backend(self, "reminders.db")
+        self.now = at("2025-01-03", 12)
+        self.batches = []
+        self.scheduler = ReminderScheduler(self.backend.connect, [self.batches.append], hour=8,
+                                           repeat=0, batch_size=4, clock=lambda: self.now)
+        self.scheduler.load()
+
+    def fired_ids(self):
+        return sorted(e["assignment_id"] for batch in self.batches for e in batch)
+
+    def test_loads_only_open_assignments_in_the_window(self):
+        # schema.sql seeds 10 open assignments out of 20; 2025-01-01 is past the 1-day window
+        self.assertEqual(self.scheduler.metrics()["queue_depth"], 9)
+
+    def test_fires_due_in_batches_once(self):
+        due = self.scheduler.metrics()["due_now"]
+        self.assertEqual(self.scheduler.run_due(), due)
+        self.assertTrue(all(len(b) <= 4 for b in self.batches))
+        self.assertTrue(all(e["assigned_date"] <= "2025-01-03" for b in self.batches for e in b))
+        self.assertEqual(self.scheduler.run_due(), 0)
+
+    def write(self, sql, params):
+        # what a route does: the change and its log entry in one transaction
+        db = self.backend.connect(); cur = db.cursor()
+        cur.execute(sql, params)
+        assignment_id = params[-1] if sql.startswith(("UPDATE", "DELETE")) else cur.lastrowid
+        self.scheduler.publish([assignment_id], cur)
+        db.commit(); db.close()
+        return assignment_id
+
+    def add(self, day, is_completed=0):
+        return self.write("INSERT INTO chore_assignments (member_id, chore_id, assigned_date, is_completed) "
+                          "VALUES (%s,%s,%s,%s)", (1, 1, day, is_completed))
+
+    def test_logged_changes_keep_queue_current(self):
+        kept, deleted, done = self.add("2025-01-03"), self.add("2025-01-03"), self.add("2025-01-03", 1)
+        self.write("DELETE FROM chore_assignments WHERE assignment_id=%s", (deleted,))
+        self.assertEqual(self.scheduler.poll_changes(), 3)
+        self.scheduler.run_due()
+        self.assertIn(kept, self.fired_ids())
+        self.assertNotIn(deleted, self.fired_ids())
+        self.assertNotIn(done, self.fired_ids())
+
+    def test_moved_date_reschedules(self):
+        moved = self.add("2025-01-03")
+        self.write("UPDATE chore_assignments SET assigned_date=%s WHERE assignment_id=%s", ("2025-01-09", moved))
+        self.scheduler.poll_changes()
+        self.scheduler.run_due()
+        self.assertNotIn(moved, self.fired_ids())
+        self.now = at("2025-01-09", 8)
+        self.scheduler.run_due()
+        self.assertIn(moved, self.fired_ids())
+
+    def test_poll_reads_only_new_changes(self):
+        self.add("2025-01-03")
+        self.assertEqual(self.scheduler.poll_changes(), 1)
+        self.assertEqual(self.scheduler.poll_changes(), 1)  # still inside the overlap window
+        for _ in range(ReminderScheduler.POLL_OVERLAP + 5):
+            self.add("2025-01-05")
+        self.scheduler.poll_changes()
+        db = self.backend.connect(); cur = db.cursor()
+        cur.execute("SELECT COUNT(*) AS n FROM reminder_changes")
+        self.assertEqual(cur.fetchone()["n"], ReminderScheduler.POLL_OVERLAP)
+        db.close()
+
+    def test_waiting_process_takes_over_the_lock(self):
+        lock = os.path.join(self.backend.dir, "reminders.lock")
+        first = ReminderScheduler(self.backend.connect, repeat=0, poll_interval=0.05, lock_retry=0.05)
+        second = ReminderScheduler(self.backend.connect, repeat=0, poll_interval=0.05, lock_retry=0.05)
+        try:
+            first.start(FileLock(lock))
+            self.assertTrue(wait_for(lambda: first.leader))
+            second.start(FileLock(lock))
+            time.sleep(0.2)
+            self.assertFalse(second.leader)
+            first.stop()
+            self.assertTrue(wait_for(lambda: second.leader))
+            self.assertEqual(second.stats["loads"], 1)
+        finally:
+            first.stop()
+            second.stop()
+
+    def test_repeat_and_reload_do_not_refire(self):
+        self.scheduler.repeat = 3600
+        first = self.scheduler.run_due()
+        self.scheduler.load()
+        self.assertEqual(self.scheduler.run_due(), 0)
+        self.now += 3600
+        self.assertEqual(self.scheduler.run_due(), first)
+        overdue = {e["assigned_date"]: e["overdue"] for e in self.batches[-1]}
+        self.assertEqual(overdue, {"2025-01-02": True, "2025-01-03": False})
+
+    def test_reminders_stop_when_the_window_closes(self):
+        self.scheduler.repeat = 6 * 3600
+        self.scheduler.run_due()
+        self.now = at("2025-01-04", 1)
+        self.batches.clear()
+        self.scheduler.run_due()
+        fired = {str(e["assigned_date"]) for batch in self.batches for e in batch}
+        self.assertNotIn("2025-01-02", fired)  # its window ended at midnight
+        self.assertIn("2025-01-03", fired)
+        old = self.add("2024-12-01")
+        self.scheduler.poll_changes()
+        self.assertNotIn(old, self.scheduler._entries)
+
+    def test_failing_sink_is_counted(self):
+        def broken(events):
+            raise RuntimeError("down")
+        self.scheduler.sinks.insert(0, broken)
+        fired = self.scheduler.run_due()
+        self.assertEqual(len(self.fired_ids()), fired)
+        self.assertGreater(self.scheduler.stats["sink_errors"], 0)
+
+    def test_leader_steps_down_when_its_lock_is_lost(self):
+        class Lock:
+            ok = True
+            def acquire(self):
+                return self.ok
+            def held(self):
+                return self.ok
+            def release(self):
+                pass
+        lock = Lock()
+        scheduler = ReminderScheduler(self.backend.connect, repeat=0, poll_interval=0.05, lock_retry=0.05)
+        try:
+            scheduler.start(lock)
+            self.assertTrue(wait_for(lambda: scheduler.leader))
+            lock.ok = False  # e.g. the MySQL session holding GET_LOCK dropped
+            with self.assertLogs("reminders", "WARNING"):
+                self.assertTrue(wait_for(lambda: not scheduler.leader))
+            self.assertEqual(scheduler.metrics()["queue_depth"], 0)
+        finally:
+            scheduler.stop()
+
+if __name__ == "__main__":
+    unittest.main()
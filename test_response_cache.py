@@ -0,0 +1,90 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+from flask import Flask, jsonify
+from response_cache import ResponseCache
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        path = os.path.join(tempfile.mkdtemp(), "cache.db")
+        self.cache = ResponseCache(path, namespace="test", max_bytes=4096)
+        self.calls = 0
+        app = Flask(__name__)
+
+        @app.route("/items")
+        @self.cache.cached("items")
+        def items():
+            self.calls += 1
+            return jsonify({"call": self.calls, "pad": "x" * 1000})
+
+        self.client = app.test_client()
+
+    def test_hit_after_miss(self):
+        first = self.client.get("/items")
+        second = self.client.get("/items")
+        self.assertEqual(first.headers["X-Cache"], "MISS")
+        self.assertEqual(second.headers["X-Cache"], "HIT")
+        self.assertEqual(second.get_json(), first.get_json())
+        self.assertEqual(second.mimetype, "application/json")
+        self.assertEqual(self.calls, 1)
+
+    def test_bump_invalidates(self):
+        self.client.get("/items")
+        self.cache.bump("items")
+        self.assertEqual(self.client.get("/items").get_json()["call"], 2)
+
+    def test_failed_bump_stops_cache_reads_until_retried(self):
+        self.client.get("/items")
+        locked = sqlite3.OperationalError("database is locked")
+        with mock.patch.object(self.cache, "_db", side_effect=locked), \
+                mock.patch("response_cache.time.sleep"), self.assertLogs("response_cache", "ERROR"):
+            self.cache.bump("items")
+            served = self.client.get("/items")  # still failing: skip the cache, don't serve the old body
+        self.assertNotIn("X-Cache", served.headers)
+        self.assertEqual(served.get_json()["call"], 2)
+        retried = self.client.get("/items")  # the bump goes through on this request
+        self.assertEqual(retried.headers["X-Cache"], "MISS")
+        self.assertEqual(retried.get_json()["call"], 3)
+
+    def test_query_string_is_part_of_key(self):
+        self.client.get("/items?format=xml")
+        self.client.get("/items?a=1&b=2")
+        self.assertEqual(self.client.get("/items?b=2&a=1").headers["X-Cache"], "HIT")
+        self.assertEqual(self.calls, 2)
+
+    def test_bypass_skips_lookup_and_store(self):
+        self.cache.bypass = lambda tables: True
+        self.client.get("/items")
+        self.assertNotIn("X-Cache", self.client.get("/items").headers)
+        self.cache.bypass = None
+        self.assertEqual(self.client.get("/items").headers["X-Cache"], "MISS")
+
+    def test_replica_read_not_stored_right_after_bump(self):
+        self.cache.replica_lag = 60
+        self.cache.used_replica = lambda: True
+        self.cache.bump("items")
+        self.client.get("/items")
+        self.assertEqual(self.client.get("/items").headers["X-Cache"], "MISS")
+        self.cache.replica_lag = 0
+        self.client.get("/items")
+        self.assertEqual(self.client.get("/items").headers["X-Cache"], "HIT")
+
+    def test_lru_eviction_under_byte_budget(self):
+        for i in range(10):
+            self.client.get(f"/items?page={i}")
+        stats = self.cache.stats()
+        self.assertLessEqual(stats["bytes"], 4096)
+        self.assertGreater(stats["evictions"], 0)
+        self.assertEqual(self.client.get("/items?page=9").headers["X-Cache"], "HIT")
+
+    def test_stats_hit_rate(self):
+        for _ in range(4):
+            self.client.get("/items")
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (3, 1))
+        self.assertEqual(stats["hit_rate"], 0.75)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import datetime
+import unittest
+from unittest import mock
+from revocation import BloomFilter, RevocationError, TokenRevocations
+from schema_fixture import schema_backend
+
+class BloomFilterTest(unittest.TestCase):
+    def test_no_false_negatives_and_few_false_positives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"jti-{i}")
+        self.assertTrue(all(f"jti-{i}" in bloom for i in range(1000)))
+        false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+class TokenRevocationsTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = schema_backend(self, "revoked.db")
+        self.later = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+
+    def store(self, **kwargs):
+        return TokenRevocations(self.backend.connect, **kwargs)
+
+    def test_revoked_jti_is_denied_and_others_skip_the_table(self):
+        revocations = self.store()
+        revocations.revoke("abc", self.later)
+        self.assertTrue(revocations.is_revoked("abc"))
+        self.assertFalse(revocations.is_revoked("xyz"))
+        self.assertFalse(revocations.is_revoked(None))
+        self.assertEqual(revocations.stats["store_lookups"], 1)
+
+    def test_other_worker_sees_revocation_after_poll(self):
+        clock = [0.0]
+        worker = self.store(poll_interval=2, clock=lambda: clock[0])
+        self.assertFalse(worker.is_revoked("abc"))
+        self.store().revoke("abc", self.later)
+        self.assertFalse(worker.is_revoked("abc"))  # not polled yet
+        clock[0] += 2
+        self.assertTrue(worker.is_revoked("abc"))
+
+    def insert(self, jti, expires_at):
+        db = self.backend.connect(); cur = db.cursor()
+        cur.execute("INSERT INTO revoked_tokens (jti, expires_at, revoked_at) VALUES (%s,%s,%s)",
+                    (jti, expires_at, datetime.datetime.utcnow()))
+        db.commit(); db.close()
+
+    def test_filter_is_rebuilt_in_background_once_half_has_expired(self):
+        clock = [0.0]
+        revocations = self.store(poll_interval=1, clock=lambda: clock[0])
+        soon = datetime.datetime.utcnow() + datetime.timedelta(minutes=1)
+        for i in range(4):
+            self.insert(f"short-{i}", soon if i < 2 else self.later)
+        revocations.sync(force=True)
+        self.assertEqual(revocations.status()["entries"], 4)
+        clock[0] += 1
+        with mock.patch("revocation.utcnow", return_value=soon + datetime.timedelta(seconds=1)):
+            revocations.is_revoked("xyz")  # polls, sees 2 of 4 expired, starts the rebuild
+            revocations._rebuilder.join(5)
+        self.assertEqual(revocations.status()["entries"], 2)
+        self.assertEqual(revocations.stats["rebuilds"], 2)
+        self.assertTrue(revocations.is_revoked("short-3"))
+
+    def test_few_expired_entries_do_not_rebuild(self):
+        clock = [0.0]
+        revocations = self.store(poll_interval=1, clock=lambda: clock[0])
+        soon = datetime.datetime.utcnow() + datetime.timedelta(minutes=1)
+        self.insert("gone", soon)
+        for i in range(3):
+            self.insert(f"live-{i}", self.later)
+        revocations.sync(force=True)
+        clock[0] += 1
+        with mock.patch("revocation.utcnow", return_value=soon + datetime.timedelta(seconds=1)):
+            revocations.is_revoked("xyz")
+            self.assertEqual(revocations.status()["expired_entries"], 1)
+        self.assertIsNone(revocations._rebuilder)
+
+    def test_purge_deletes_only_expired_rows(self):
+        revocations = self.store()
+        self.insert("old", datetime.datetime.utcnow() - datetime.timedelta(minutes=1))
+        revocations.revoke("abc", self.later)
+        self.assertEqual(revocations.purge_expired(), 1)
+        cur = self.backend.connect().cursor()
+        cur.execute("SELECT jti FROM revoked_tokens")
+        self.assertEqual([r["jti"] for r in cur.fetchall()], ["abc"])
+
+    def test_failed_load_backs_off(self):
+        calls, clock = [], [0.0]
+        def down():
+            calls.append(1)
+            raise OSError("store down")
+        revocations = TokenRevocations(down, poll_interval=2, clock=lambda: clock[0])
+        with self.assertLogs("revocation", "ERROR"):
+            for _ in range(5):
+                self.assertFalse(revocations.is_revoked("abc"))
+        self.assertEqual(len(calls), 1)
+        clock[0] += 2
+        with self.assertLogs("revocation", "ERROR"):
+            revocations.is_revoked("abc")
+        self.assertEqual(len(calls), 2)
+        self.assertFalse(revocations.status()["loaded"])
+
+    def test_revoke_reports_a_failed_write(self):
+        def down():
+            raise OSError("store down")
+        with self.assertLogs("revocation", "ERROR"), self.assertRaises(RevocationError):
+            TokenRevocations(down).revoke("abc", self.later)
+
+    def test_already_expired_token_is_not_stored(self):
+        past = datetime.datetime.utcnow() - datetime.timedelta(seconds=5)
+        self.assertFalse(self.store().revoke("gone", past))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+from unittest import mock
+
+import click
+from click.testing import CliRunner
+
+import serve
+
+class ServeTest(unittest.TestCase):
+    def test_gunicorn_options(self):
+        forked, exited = [], []
+        options = serve.gunicorn_options("0.0.0.0:9000", workers=3, threads=1, max_requests=500,
+                                         on_fork=lambda: forked.append(1), on_exit=lambda: exited.append(1))
+        self.assertEqual(options["bind"], "0.0.0.0:9000")
+        self.assertEqual(options["workers"], 3)
+        self.assertEqual(options["worker_class"], "sync")
+        self.assertEqual(options["max_requests_jitter"], 50)
+        self.assertTrue(options["preload_app"])
+        options["post_fork"](None, None)
+        options["worker_exit"](None, None)
+        self.assertEqual((forked, exited), ([1], [1]))
+        self.assertEqual(serve.gunicorn_options(threads=4)["worker_class"], "gthread")
+
+    def test_schema_setup_runs_once_before_serving(self):
+        calls = []
+        class BaseApplication:
+            def run(self):
+                calls.append("serve")
+        with mock.patch.dict("sys.modules", {"gunicorn.app.base": mock.Mock(BaseApplication=BaseApplication)}):
+            command = serve.command(object(), on_start=lambda: calls.append("init_db"))
+            result = CliRunner().invoke(command, ["--workers", "2"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(calls, ["init_db", "serve"])
+
+    def test_missing_gunicorn_is_a_usage_error(self):
+        with mock.patch.dict("sys.modules", {"gunicorn.app.base": None}):
+            with self.assertRaises(click.ClickException):
+                serve.run(object(), on_start=self.fail)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+import atexit
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from schema_fixture import schema_backend
+from storage import translate
+
+tmpdir = tempfile.mkdtemp()
+chores_app = login_app = None
+
+def load_fresh(name, filename):
+    # a private copy of the module, so the real `app`/`login` imports stay on their own config
+    spec = importlib.util.spec_from_file_location(name, os.path.join(os.path.dirname(__file__), filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+def setUpModule():
+    global chores_app, login_app
+    # both apps pick their backend up from the environment at import time
+    with mock.patch.dict(os.environ, {
+        "DB_BACKEND": "sqlite",
+        "SQLITE_PATH": os.path.join(tmpdir, "house_chores.db"),
+        "RESPONSE_CACHE_PATH": os.path.join(tmpdir, "cache.db"),
+    }):
+        chores_app = load_fresh("app_on_sqlite", "app.py")
+        login_app = load_fresh("login_on_sqlite", "login.py")
+
+def tearDownModule():
+    atexit.unregister(chores_app.completions.close)
+    chores_app.completions.close()
+    for name in ("app_on_sqlite", "login_on_sqlite"):
+        sys.modules.pop(name, None)
+    shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+class TranslateTest(unittest.TestCase):
+    def test_placeholders_and_auto_increment(self):
+        self.assertEqual(translate("SELECT * FROM members WHERE name LIKE %s"),
+                         "SELECT * FROM members WHERE name LIKE ?")
+        self.assertIn("INTEGER PRIMARY KEY AUTOINCREMENT",
+                      translate("member_id INT AUTO_INCREMENT PRIMARY KEY"))
+
+    def test_schema_sql_loads(self):
+        backend = schema_backend(self, "schema.db")
+        cur = backend.connect().cursor()
+        cur.execute("SELECT COUNT(*) AS n FROM chore_assignments WHERE is_completed = %s", (1,))
+        self.assertEqual(cur.fetchone()["n"], 10)
+
+
+class ChoresAppOnSQLiteTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        chores_app.init_db()
+        cls.client = chores_app.app.test_client()
+        cls.client.post("/register", data={"username": "kiosk", "password": "pw"})
+        cls.client.post("/login", data={"username": "kiosk", "password": "pw"})
+
+    def test_crud_pages(self):
+        self.client.post("/members/add", data={"name": "Ana"})
+        self.client.post("/chores/add", data={"chore_name": "Sweep", "frequency": "Daily"})
+        members = self.client.get("/api/members").get_json()
+        chores = self.client.get("/api/chores?search=Swe").get_json()
+        self.assertEqual([m["name"] for m in members], ["Ana"])
+        self.client.post("/assignments/add", data={
+            "member_id": members[0]["member_id"], "chore_id": chores[0]["chore_id"],
+            "assigned_date": "2025-01-01"
+        })
+        rows = self.client.get("/api/assignments").get_json()
+        self.assertEqual(rows[0]["chore_name"], "Sweep")
+        self.assertIn(b"Sweep", self.client.get("/assignments").data)
+        self.assertEqual(self.client.get(f"/assignments/edit/{rows[0]['assignment_id']}").status_code, 200)
+        xml = self.client.get("/api/members?format=xml")
+        self.assertEqual(xml.mimetype, "application/xml")
+
+    def test_field_selection(self):
+        slim = self.client.get("/api/assignments?fields=chore_name,is_completed").get_json()
+        self.assertTrue(all(set(row) == {"chore_name", "is_completed"} for row in slim))
+        self.assertEqual(self.client.get("/api/members?fields=password").status_code, 400)
+        for path in ("/api/members?fields=,", "/api/assignments?fields=%20,%20"):
+            r = self.client.get(path)
+            self.assertEqual(r.status_code, 400)
+            self.assertEqual(r.get_json()["error"], "no fields requested")
+
+    def test_auto_assign_preview_xml(self):
+        preview = self.client.post("/api/assignments/auto/preview?format=xml", json={"days": 2})
+        self.assertEqual(preview.mimetype, "application/xml")
+
+    def test_toggle_unknown_assignment_is_404(self):
+        missing = self.client.post("/api/assignments/999999/complete", json={"is_completed": 1})
+        self.assertEqual(missing.status_code, 404)
+
+
+class LoginAppOnSQLiteTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        chores_app.init_db()
+        cls.client = login_app.app.test_client()
+        cls.client.post("/auth/register", json={"username": "api", "password": "pw"})
+        token = cls.client.post("/auth/login", json={"username": "api", "password": "pw"}).get_json()["token"]
+        cls.headers = {"Authorization": f"Bearer {token}"}
+
+    def test_api_routes(self):
+        r = self.client.post("/members", json={"name": "Rico"}, headers=self.headers)
+        self.assertEqual(r.status_code, 201)
+        member_id = r.get_json()["member_id"]
+        r = self.client.post("/chores", json={"chore_name": "Trash", "frequency": "Daily"}, headers=self.headers)
+        chore_id = r.get_json()["chore_id"]
+        r = self.client.post("/assignments", json={
+            "member_id": member_id, "chore_id": chore_id, "assigned_date": "2025-02-01"
+        }, headers=self.headers)
+        self.assertEqual(r.status_code, 201)
+        rows = self.client.get("/assignments", headers=self.headers).get_json()
+        self.assertIn("2025-02-01", [r["assigned_date"] for r in rows])
+        found = self.client.get("/api/search?q=Tra", headers=self.headers).get_json()
+        self.assertEqual(found[0]["chore_name"], "Trash")
+
+    def test_field_selection(self):
+        ids = self.client.get("/assignments?fields=assignment_id", headers=self.headers).get_json()
+        self.assertTrue(all(set(row) == {"assignment_id"} for row in ids))
+        r = self.client.get("/members?fields=secret", headers=self.headers)
+        self.assertEqual(r.status_code, 400)
+        r = self.client.get("/members?fields=,", headers=self.headers)
+        self.assertEqual(r.status_code, 400)
+
+    def test_admin_routes_off_by_default(self):
+        self.client.post("/auth/register", json={"username": "admin", "password": "pw"})
+        token = self.client.post("/auth/login", json={"username": "admin", "password": "pw"}).get_json()["token"]
+        r = self.client.get("/admin/tokens/revocations", headers={"Authorization": f"Bearer {token}"})
+        self.assertEqual(r.status_code, 403)
+
+    def test_logout_revokes_token(self):
+        token = self.client.post("/auth/login", json={"username": "api", "password": "pw"}).get_json()["token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        self.assertEqual(self.client.get("/members", headers=headers).status_code, 200)
+        self.assertEqual(self.client.post("/auth/logout", headers=headers).status_code, 200)
+        self.assertEqual(self.client.get("/members", headers=headers).status_code, 401)
+        # same secret and table, so the other app refuses it once it has polled
+        chores_app.revocations.sync(force=True)
+        self.assertEqual(chores_app.app.test_client().get("/api/members", headers=headers).status_code, 401)
+
+    def test_logout_reports_unrecorded_revocation(self):
+        token = self.client.post("/auth/login", json={"username": "api", "password": "pw"}).get_json()["token"]
+        with mock.patch.object(login_app.revocations, "connect", side_effect=OSError("store down")), \
+                self.assertLogs("revocation", "ERROR"):
+            r = self.client.post("/auth/logout", headers={"Authorization": f"Bearer {token}"})
+        self.assertEqual(r.status_code, 503)
+
+if __name__ == "__main__":
+    unittest.main()
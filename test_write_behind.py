@@ -0,0 +1,110 @@
+import os
+import tempfile
+import threading
+import unittest
+from write_behind import CompletionBuffer
+
+class RecordingConnection:
+    def __init__(self, log):
+        self.log = log
+    def cursor(self):
+        return self
+    def executemany(self, sql, rows):
+        self.log.append(list(rows))
+    def commit(self):
+        pass
+    def close(self):
+        pass
+
+class SlowConnection(RecordingConnection):
+    def __init__(self, log, started, release):
+        super().__init__(log)
+        self.started, self.release = started, release
+    def executemany(self, sql, rows):
+        self.started.set()
+        self.release.wait(5)
+        super().executemany(sql, rows)
+
+class CompletionBufferTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "pending.db")
+        self.batches = []
+        self.buffer = self.worker()
+
+    def worker(self, connection=None):
+        # every buffer on the same file acts like another worker process on the host
+        return CompletionBuffer(connection or (lambda: RecordingConnection(self.batches)), self.path, interval=60)
+
+    def tearDown(self):
+        self.buffer.close()
+
+    def test_toggles_are_coalesced(self):
+        for value in (1, 0, 1, 1, 0):
+            self.buffer.put(7, value)
+        self.buffer.put(3, 1)
+        self.assertEqual(self.buffer.flush(), 2)
+        self.assertEqual(self.batches, [[(1, 3), (0, 7)]])
+
+    def test_read_your_writes(self):
+        self.buffer.put(5, True)
+        self.assertEqual(self.buffer.get(5), 1)
+        rows = self.buffer.overlay([{"assignment_id": 5, "is_completed": 0},
+                                    {"assignment_id": 6, "is_completed": 0}])
+        self.assertEqual([r["is_completed"] for r in rows], [1, 0])
+
+    def test_discard_drops_pending(self):
+        self.buffer.put(9, 1)
+        self.buffer.discard(9)
+        self.assertEqual(self.buffer.flush(), 0)
+
+    def test_inflight_batch_stays_visible(self):
+        started, release = threading.Event(), threading.Event()
+        buffer = self.worker(lambda: SlowConnection(self.batches, started, release))
+        buffer.put(7, 1)
+        flusher = threading.Thread(target=buffer.flush)
+        flusher.start()
+        started.wait(5)
+        self.assertEqual(buffer.get(7), 1)
+        self.assertEqual(buffer.overlay([{"assignment_id": 7, "is_completed": 0}])[0]["is_completed"], 1)
+        release.set()
+        flusher.join()
+        self.assertIsNone(buffer.get(7))
+        buffer.close()
+
+    def test_other_workers_see_and_flush_pending_toggles(self):
+        other = self.worker()
+        self.buffer.put(8, 1)
+        self.assertEqual(other.get(8), 1)
+        self.assertTrue(other.has_pending())
+        self.assertEqual(other.overlay([{"assignment_id": 8, "is_completed": 0}])[0]["is_completed"], 1)
+        self.assertEqual(other.flush(), 1)
+        self.assertEqual(self.buffer.flush(), 0)
+        self.assertFalse(self.buffer.has_pending())
+        other.close()
+
+    def test_retoggle_during_flush_is_kept(self):
+        started, release = threading.Event(), threading.Event()
+        slow = self.worker(lambda: SlowConnection(self.batches, started, release))
+        slow.put(7, 1)
+        flusher = threading.Thread(target=slow.flush)
+        flusher.start()
+        started.wait(5)
+        self.buffer.put(7, 0)
+        self.assertEqual(self.buffer.flush(), 0)  # the other worker holds the lease
+        release.set()
+        flusher.join()
+        self.assertEqual(self.buffer.get(7), 0)
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(self.batches, [[(1, 7)], [(0, 7)]])
+        slow.close()
+
+    def test_close_flushes(self):
+        self.buffer.put(4, 1)
+        self.buffer.close()
+        self.assertEqual(self.batches, [[(1, 4)]])
+        self.assertEqual(len(self.buffer), 0)
+
+if __name__ == "__main__":
+    unittest.main()
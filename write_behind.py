@@ -0,0 +1,229 @@
+# ==================================================
+# WRITE-BEHIND BUFFER FOR COMPLETION TOGGLES
+# Coalesces repeated is_completed toggles per assignment
+# and flushes them to the database in batches. Pending
+# toggles live in a local SQLite file, so every worker
+# process on the host sees them until they are written.
+# ==================================================
+
+import atexit
+import os
+import sqlite3
+import threading
+import time
+
+
+class CompletionBuffer:
+    """Holds the latest is_completed value per assignment_id until flushed.
+
+    Only the last toggle for an assignment is written, so a checkbox mashed
+    ten times costs one UPDATE. A background thread flushes every
+    `interval` seconds, or sooner once `max_pending` toggles are waiting.
+
+    The buffer is the pending_completions table in the SQLite file at
+    `path` (the response cache's file in the apps). A flush claims every
+    row under a host-wide lease, writes them to the database and deletes
+    the ones nobody re-toggled meanwhile, so rows stay visible to get() and
+    overlay() in every worker until they have committed. A lease older than
+    `lease_seconds` belongs to a dead worker and is taken over.
+    """
+
+    SQL = "UPDATE chore_assignments SET is_completed=%s WHERE assignment_id=%s"
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS pending_completions (
+        assignment_id INTEGER PRIMARY KEY,
+        is_completed INTEGER,
+        batch INTEGER
+    );
+    CREATE TABLE IF NOT EXISTS completion_flushes (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        batch INTEGER,
+        claimed_at REAL
+    );
+    """
+
+    def __init__(self, connect, path, interval=0.5, max_pending=500, lease_seconds=30):
+        self.connect = connect
+        self.path = path
+        self.interval = interval
+        self.max_pending = max_pending
+        self.lease_seconds = lease_seconds
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = None
+        self._since_flush = 0
+        self.on_flush = None
+        self.stats = {"toggles": 0, "flushes": 0, "rows_written": 0, "errors": 0}
+        atexit.register(self.close)
+
+    def _db(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def after_fork(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+
+    # ---------- caller side ----------
+    def put(self, assignment_id, is_completed):
+        # a re-toggle clears batch, so an in-flight flush won't delete the newer value
+        self._db().execute(
+            "INSERT INTO pending_completions (assignment_id, is_completed, batch) VALUES (?, ?, NULL) "
+            "ON CONFLICT(assignment_id) DO UPDATE SET is_completed = excluded.is_completed, batch = NULL",
+            (int(assignment_id), 1 if is_completed else 0))
+        with self._lock:
+            self.stats["toggles"] += 1
+            self._since_flush += 1
+            full = self._since_flush >= self.max_pending
+        self._ensure_thread()
+        if full:
+            self._wake.set()
+
+    def get(self, assignment_id, default=None):
+        """Pending value for an assignment (read-your-writes, from any worker), or default."""
+        row = self._db().execute("SELECT is_completed FROM pending_completions WHERE assignment_id=?",
+                                 (int(assignment_id),)).fetchone()
+        return default if row is None else row[0]
+
+    def discard(self, assignment_id):
+        """Drop a pending toggle, e.g. when the row is rewritten or deleted.
+
+        Waits for a flush that is writing it so the caller's own write lands after it.
+        """
+        db = self._db()
+        deadline = time.time() + self.lease_seconds
+        with self._flush_lock:
+            while True:
+                db.execute("BEGIN IMMEDIATE")
+                row = db.execute("SELECT batch FROM pending_completions WHERE assignment_id=?",
+                                 (int(assignment_id),)).fetchone()
+                if row is None or row[0] is None or time.time() > deadline:
+                    db.execute("DELETE FROM pending_completions WHERE assignment_id=?", (int(assignment_id),))
+                    db.execute("COMMIT")
+                    return
+                db.execute("COMMIT")
+                time.sleep(0.01)  # another worker is writing it
+
+    def pending(self):
+        """{assignment_id: is_completed} for every unwritten toggle, including a batch mid-flush."""
+        return dict(self._db().execute("SELECT assignment_id, is_completed FROM pending_completions"))
+
+    def overlay(self, rows):
+        """Apply pending toggles to rows read from the database."""
+        pending = self.pending()
+        if not pending:
+            return rows
+        for row in rows:
+            value = pending.get(row.get("assignment_id"))
+            if value is not None:
+                row["is_completed"] = value
+        return rows
+
+    def has_pending(self):
+        """True while any toggle is unwritten, in this worker or another."""
+        return self._db().execute("SELECT 1 FROM pending_completions LIMIT 1").fetchone() is not None
+
+    def __len__(self):
+        return self._db().execute(
+            "SELECT COUNT(*) FROM pending_completions WHERE batch IS NULL").fetchone()[0]
+
+    # ---------- flushing ----------
+    def _claim(self):
+        """Take the host-wide lease and every pending row; None if another worker holds it."""
+        db = self._db()
+        now, batch = time.time(), int.from_bytes(os.urandom(7), "big")
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            lease = db.execute("SELECT claimed_at FROM completion_flushes WHERE id = 1").fetchone()
+            if lease is not None and now - lease[0] < self.lease_seconds:
+                db.execute("COMMIT")
+                return None, {}
+            db.execute("INSERT OR REPLACE INTO completion_flushes (id, batch, claimed_at) VALUES (1, ?, ?)",
+                       (batch, now))
+            db.execute("UPDATE pending_completions SET batch = ?", (batch,))
+            rows = dict(db.execute("SELECT assignment_id, is_completed FROM pending_completions WHERE batch = ?",
+                                   (batch,)))
+            db.execute("COMMIT")
+        except sqlite3.Error:
+            db.execute("ROLLBACK")
+            raise
+        return batch, rows
+
+    def _release(self, batch, written):
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        if written:
+            db.execute("DELETE FROM pending_completions WHERE batch = ?", (batch,))
+        else:
+            # back in the queue; rows re-toggled meanwhile already have batch NULL
+            db.execute("UPDATE pending_completions SET batch = NULL WHERE batch = ?", (batch,))
+        db.execute("DELETE FROM completion_flushes WHERE batch = ?", (batch,))
+        db.execute("COMMIT")
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                self._since_flush = 0
+            batch_id, batch = self._claim()
+            if not batch:
+                if batch_id is not None:
+                    self._release(batch_id, True)
+                return 0
+            rows = [(value, assignment_id) for assignment_id, value in sorted(batch.items())]
+            try:
+                db = self.connect(); cur = db.cursor()
+                try:
+                    cur.executemany(self.SQL, rows)
+                    db.commit()
+                finally:
+                    db.close()
+            except Exception:
+                self._release(batch_id, False)
+                with self._lock:
+                    self.stats["errors"] += 1
+                raise
+            self._release(batch_id, True)
+            self.stats["flushes"] += 1
+            self.stats["rows_written"] += len(rows)
+            if self.on_flush:
+                self.on_flush(batch)
+            return len(rows)
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                time.sleep(self.interval)
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name="completion-flusher", daemon=True)
+            self._thread.start()
+
+    def close(self):
+        """Stop the flusher and write out everything still pending."""
+        self._stopped = True
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        if os.path.exists(self.path):
+            self.flush()